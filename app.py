@@ -1,14 +1,30 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import os
+import sys
+import atexit
 import json
 import tempfile
 import shutil
 from werkzeug.utils import secure_filename
-import openai
 from pptx import Presentation
-import mammoth
 import PyPDF2
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # Optional native PDF backend
+    pdfium = None
+try:
+    import orjson
+except ImportError:  # Optional fast JSON parser
+    orjson = None
+try:
+    import redis
+except ImportError:  # Optional rate limiting shared across workers
+    redis = None
+try:
+    from flask_compress import Compress
+except ImportError:  # Optional response compression
+    Compress = None
 import io
 import base64
 from datetime import datetime
@@ -17,17 +33,27 @@ from dotenv import load_dotenv
 from typing import Dict, List, Any, Optional
 from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from functools import wraps
+from functools import wraps, lru_cache
+from contextlib import contextmanager
 import time
+import threading
+import asyncio
+import itertools
+import operator
 import gc
 import psutil
 import hashlib
-import pickle
+import mmap
+import zipfile
+from collections import OrderedDict
+import posixpath
+from lxml import etree
 
 # Enhanced error handling and performance improvements
 import traceback
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pptx.dml.color import RGBColor
+from pptx.enum.dml import MSO_THEME_COLOR
 
 # Load environment variables
 load_dotenv()
@@ -43,6 +69,19 @@ CORS(app)
 app.config['MAX_CONTENT_LENGTH'] = 200 * 1024 * 1024 * 3  # 600MB max file size
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 
+# Behind a proxy that supports X-Sendfile, send_file only sets the header and the proxy streams the file
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '0') == '1'
+
+# Compress JSON and text responses (parse results are large and repetitive), Brotli first
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/plain']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+# Streamed responses (json_stream) would be buffered whole to compress them, so leave them as is
+app.config['COMPRESS_STREAMS'] = False
+if Compress is not None:
+    Compress(app)
+
 # Error types
 class ErrorType(Enum):
     FILE_TOO_LARGE = "FILE_TOO_LARGE"
@@ -63,27 +102,106 @@ class PresentationAnalyzerError(Exception):
 
 # Rate limiting
 class RateLimiter:
-    """Rate limiting for API calls"""
+    """Token-bucket rate limiting for API calls"""
     def __init__(self, max_calls: int = 10, time_window: int = 60):
         self.max_calls = max_calls
         self.time_window = time_window
-        self.calls = []
+        self.rate = max_calls / time_window  # Tokens refilled per second
+        self.tokens = float(max_calls)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def can_make_call(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            # Refill tokens for the time elapsed since the last call
+            self.tokens = min(self.max_calls, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+class RedisRateLimiter:
+    """Fixed-window rate limiting shared by every worker through Redis.
+    
+    One atomic INCR (plus EXPIRE on the window's first call) per check. While
+    Redis is unreachable, calls are limited per process instead, and Redis is
+    only retried every RETRY_AFTER seconds.
+    """
+    
+    RETRY_AFTER = 30  # Seconds to skip Redis after a failed call
+    
+    INCR_WINDOW_SCRIPT = """
+local calls = redis.call('INCR', KEYS[1])
+if calls == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return calls
+"""
+    
+    def __init__(self, client, max_calls: int = 10, time_window: int = 60, key_prefix: str = 'rl'):
+        self.max_calls = max_calls
+        self.time_window = time_window
+        self.key_prefix = key_prefix
+        self._incr_window = client.register_script(self.INCR_WINDOW_SCRIPT)
+        self.fallback = RateLimiter(max_calls, time_window)
+        self._retry_at = 0.0  # Monotonic time before which Redis is skipped; 0 while it is up
     
     def can_make_call(self) -> bool:
-        now = time.time()
-        # Remove old calls outside time window
-        self.calls = [call_time for call_time in self.calls 
-                     if now - call_time < self.time_window]
+        now = time.monotonic()
+        if now < self._retry_at:
+            return self.fallback.can_make_call()
         
-        if len(self.calls) < self.max_calls:
-            self.calls.append(now)
-            return True
-        return False
+        window = int(time.time() // self.time_window)
+        try:
+            calls = self._incr_window(keys=[f"{self.key_prefix}:{window}"], args=[self.time_window])
+        except redis.RedisError as e:
+            # Log once per outage, not on every retry
+            if not self._retry_at:
+                logger.warning(f"Redis rate limiter unavailable, limiting per process: {e}")
+            self._retry_at = now + self.RETRY_AFTER
+            return self.fallback.can_make_call()
+        
+        if self._retry_at:
+            logger.info("Redis rate limiter reachable again")
+            self._retry_at = 0.0
+        return calls <= self.max_calls
+
+def create_rate_limiter(max_calls: int, time_window: int):
+    """Redis-backed limiter when REDIS_URL is set and redis is installed, else per process"""
+    redis_url = os.environ.get('REDIS_URL')
+    if redis is None or not redis_url:
+        return RateLimiter(max_calls=max_calls, time_window=time_window)
+    client = redis.Redis.from_url(redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+    return RedisRateLimiter(client, max_calls=max_calls, time_window=time_window, key_prefix='rl:parse')
 
 # Memory management
+try:
+    import resource
+    TOTAL_MEMORY_BYTES = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+except (ImportError, ValueError, OSError, AttributeError):
+    resource = None
+
 class MemoryManager:
     """Monitor and manage memory usage"""
     
+    # Generation-0 threshold inside gc_relaxed(), and the nesting state shared across threads
+    GC_RELAXED_THRESHOLD0 = 50000
+    _gc_relax_lock = threading.Lock()
+    _gc_relax_depth = 0
+    _gc_saved_thresholds = None
+    
+    # Only sample memory on every Nth cleanup_if_needed() call
+    CHECK_INTERVAL = 10
+    _cleanup_calls = itertools.count()
+    
+    # /health probes and cleanup checks share one memory sample for this many seconds
+    HEALTH_SAMPLE_TTL = 5
+    _health_sample_lock = threading.Lock()
+    _health_sample = (float('-inf'), None)
+    
     @staticmethod
     def check_memory_usage():
         """Check current memory usage"""
@@ -98,17 +216,70 @@ class MemoryManager:
             logger.warning(f"Could not check memory usage: {e}")
             return {'rss': 0, 'percent': 0}
     
+    @classmethod
+    def cached_memory_usage(cls):
+        """check_memory_usage(), resampled at most once per HEALTH_SAMPLE_TTL seconds"""
+        with cls._health_sample_lock:
+            sampled_at, usage = cls._health_sample
+            now = time.monotonic()
+            if now - sampled_at >= cls.HEALTH_SAMPLE_TTL:
+                usage = cls.check_memory_usage()
+                cls._health_sample = (now, usage)
+            return usage
+    
+    @staticmethod
+    def peak_memory_percent():
+        """Peak RSS as a percentage of physical memory, from a single getrusage call.
+        
+        A high-water mark that never goes down, so it is only reported, not acted on.
+        """
+        if resource is None:
+            # No resource module (Windows); fall back to psutil
+            return MemoryManager.check_memory_usage()['percent']
+        
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+        max_rss_bytes = max_rss if sys.platform == 'darwin' else max_rss * 1024
+        return max_rss_bytes / TOTAL_MEMORY_BYTES * 100
+    
     @staticmethod
     def cleanup_if_needed():
-        """Force garbage collection if memory usage is high"""
+        """Force garbage collection if memory usage is high (sampled every CHECK_INTERVAL calls)"""
+        if next(MemoryManager._cleanup_calls) % MemoryManager.CHECK_INTERVAL:
+            return
+        
         try:
-            memory = MemoryManager.check_memory_usage()
-            if memory['percent'] > 80:
+            memory_percent = MemoryManager.cached_memory_usage()['percent']
+            if memory_percent > 80:
                 gc.collect()
-                logger.info(f"Forced garbage collection. Memory usage: {memory['percent']:.2f}%")
+                logger.info(f"Forced garbage collection. Memory usage: {memory_percent:.2f}%")
         except Exception as e:
             logger.warning(f"Memory cleanup failed: {e}")
     
+    @staticmethod
+    @contextmanager
+    def gc_relaxed():
+        """Collect the young generation less often while single-threaded extraction allocates.
+        
+        The collector stays enabled, so overlapping sections only space out
+        generation-0 collections. The usual thresholds come back when the last
+        section exits and the next allocation triggers an ordinary gen-0 pass.
+        """
+        with MemoryManager._gc_relax_lock:
+            if MemoryManager._gc_relax_depth == 0:
+                MemoryManager._gc_saved_thresholds = gc.get_threshold()
+                threshold0, *older = MemoryManager._gc_saved_thresholds
+                gc.set_threshold(max(threshold0, MemoryManager.GC_RELAXED_THRESHOLD0), *older)
+            MemoryManager._gc_relax_depth += 1
+        
+        try:
+            yield
+        finally:
+            with MemoryManager._gc_relax_lock:
+                MemoryManager._gc_relax_depth -= 1
+                if MemoryManager._gc_relax_depth == 0:
+                    gc.set_threshold(*MemoryManager._gc_saved_thresholds)
+    
     @staticmethod
     def process_with_memory_management(func):
         """Decorator to manage memory during processing"""
@@ -142,15 +313,25 @@ class FileValidator:
     ALLOWED_EXTENSIONS = {'ppt', 'pptx', 'doc', 'docx', 'pdf', 'txt'}
     
     @classmethod
-    def validate_file(cls, file) -> Dict[str, Any]:
-        """Comprehensive file validation"""
+    def validate_file(cls, path: str, filename: str, file_header: Optional[bytes] = None) -> Dict[str, Any]:
+        """Comprehensive validation of an uploaded file saved at path.
+        
+        file_header may pass in the first bytes already seen while saving the file.
+        """
         errors = []
         warnings = []
+        ext = ''
+        
+        # Size and magic bytes come from a single open of the file; the header
+        # is not re-read when the caller already saw it while saving
+        if file_header is None:
+            with open(path, 'rb') as f:
+                file_size = os.fstat(f.fileno()).st_size
+                file_header = f.read(8)
+        else:
+            file_size = os.path.getsize(path)
         
         # Check file size
-        file.seek(0, 2)  # Seek to end
-        file_size = file.tell()
-        file.seek(0)  # Reset to beginning
         
         if file_size > cls.MAX_FILE_SIZE:
             errors.append({
@@ -164,7 +345,6 @@ class FileValidator:
             })
         
         # Check file extension
-        filename = file.filename
         if not filename:
             errors.append({
                 'type': ErrorType.INVALID_FORMAT,
@@ -179,9 +359,6 @@ class FileValidator:
                 })
         
         # Check file content (magic bytes)
-        file_header = file.read(8)
-        file.seek(0)
-        
         # PowerPoint magic bytes
         if ext in ['ppt', 'pptx']:
             if not (file_header.startswith(b'\xd0\xcf\x11\xe0') or  # PPT
@@ -208,43 +385,33 @@ class ErrorHandler:
     
     @staticmethod
     def handle_parsing_error(func):
-        """Decorator for handling parsing errors with fallback strategies"""
+        """Decorator that falls back to text-only extraction if parsing fails.
+        
+        The reduced-features path is picked before parsing by
+        EnhancedFileParser._choose_strategy, so only one fallback is tried.
+        """
         @wraps(func)
-        def wrapper(*args, **kwargs):
-            attempts = 3
-            fallback_strategies = [
-                lambda: func(*args, **kwargs),  # Original attempt
-                lambda: ErrorHandler._parse_with_reduced_features(*args, **kwargs),  # Reduced features
-                lambda: ErrorHandler._parse_text_only(*args, **kwargs)  # Text only
-            ]
+        def wrapper(file_path, *args, **kwargs):
+            try:
+                return func(file_path, *args, **kwargs)
+            except Exception as e:
+                logger.warning(f"Parsing failed, falling back to text only: {str(e)}")
             
-            for attempt, strategy in enumerate(fallback_strategies):
-                try:
-                    return strategy()
-                except Exception as e:
-                    logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-                    if attempt == len(fallback_strategies) - 1:
-                        # All strategies failed
-                        raise PresentationAnalyzerError(
-                            ErrorType.PARSING_FAILED,
-                            "Unable to parse presentation after multiple attempts",
-                            {"original_error": str(e), "attempts": attempt + 1}
-                        )
+            try:
+                return ErrorHandler._parse_text_only(Presentation(load_for_parsing(file_path)))
+            except Exception as e:
+                logger.warning(f"Text-only fallback failed: {str(e)}")
+                raise PresentationAnalyzerError(
+                    ErrorType.PARSING_FAILED,
+                    "Unable to parse presentation after multiple attempts",
+                    {"original_error": str(e), "attempts": 2}
+                )
             
         return wrapper
     
     @staticmethod
-    def _parse_with_reduced_features(file_path, *args, **kwargs):
-        """Parse with reduced features (skip colors, fonts, etc.)"""
-        parser = EnhancedFileParser()
-        parser.skip_formatting = True  # Add this flag to your parser
-        return parser.parse_powerpoint_chunked(file_path)
-    
-    @staticmethod
-    def _parse_text_only(file_path, *args, **kwargs):
+    def _parse_text_only(prs):
         """Extract text only as last resort"""
-        from pptx import Presentation
-        prs = Presentation(file_path)
         text_content = []
         
         for slide in prs.slides:
@@ -261,8 +428,128 @@ class ErrorHandler:
             'slides': []
         }
 
+# Parse result cache
+class ParseCache:
+    """On-disk JSON cache of parse results keyed by a hash of the uploaded bytes.
+    
+    Entries older than max_age seconds are ignored, and pruned along with the
+    oldest entries once the directory grows past max_bytes.
+    """
+    
+    PRUNE_INTERVAL = 60  # Seconds between pruning passes
+    
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None, max_age: Optional[float] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def new_hasher():
+        # BLAKE2b is faster than SHA-256 and collision resistance is all we need here
+        return hashlib.blake2b(digest_size=16)
+    
+    @staticmethod
+    def hash_json(value) -> str:
+        """Hash a JSON-serializable value, independent of dict key order"""
+        hasher = ParseCache.new_hasher()
+        hasher.update(json.dumps(value, sort_keys=True, default=str).encode())
+        return hasher.hexdigest()
+    
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """Hash a file on disk"""
+        hasher = ParseCache.new_hasher()
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                # Hash the mapped pages in one call, no intermediate chunk copies
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hasher.update(mapped)
+        return hasher.hexdigest()
+    
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}.json")
+    
+    def get(self, content_hash: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached result, or None on a miss or if older than max_age seconds"""
+        if max_age is None:
+            max_age = self.max_age
+        try:
+            with open(self._path(content_hash), 'rb') as f:
+                if max_age is not None and time.time() - os.fstat(f.fileno()).st_mtime > max_age:
+                    return None
+                return loads_json(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable parse cache entry {content_hash}: {e}")
+            return None
+    
+    def set(self, content_hash: str, result: Dict[str, Any]):
+        """Store a parse result, writing atomically so readers never see a partial file"""
+        try:
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as tmp_file:
+                tmp_file.write(dumps_json_bytes(result))
+            os.replace(tmp_file.name, self._path(content_hash))
+        except Exception as e:
+            logger.warning(f"Could not write parse cache entry {content_hash}: {e}")
+        
+        if time.time() - self._last_prune > self.PRUNE_INTERVAL and self._prune_lock.acquire(blocking=False):
+            try:
+                self._last_prune = time.time()
+                self.prune()
+            finally:
+                self._prune_lock.release()
+    
+    def prune(self):
+        """Delete expired entries, then the oldest ones until the cache fits in max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            # Entries (and leftovers of the former pickle format); skips in-flight .tmp writes
+            if not entry.name.endswith(('.json', '.pkl')):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        entries.sort()
+        expired_before = time.time() - self.max_age if self.max_age is not None else None
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            over_size = self.max_bytes is not None and total > self.max_bytes
+            expired = expired_before is not None and mtime < expired_before
+            if not (over_size or expired):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
 # Initialize rate limiter
-rate_limiter = RateLimiter(max_calls=20, time_window=60)
+rate_limiter = create_rate_limiter(max_calls=20, time_window=60)
+
+# Initialize parse cache
+parse_cache = ParseCache(
+    os.environ.get('PARSE_CACHE_DIR', 'cache'),
+    max_bytes=int(os.environ.get('PARSE_CACHE_MAX_MB', 1024)) * 1024 * 1024,
+    max_age=int(os.environ.get('PARSE_CACHE_TTL', 7 * 24 * 3600))  # Seconds
+)
+
+# Part of every parse cache key; bump whenever parser output changes
+PARSE_CACHE_VERSION = 1
+
+# Design and slide analyses, keyed by a hash of everything that goes into the prompt
+ANALYSIS_CACHE_TTL = int(os.environ.get('ANALYSIS_CACHE_TTL', 3600))  # Seconds
+analysis_cache = ParseCache(
+    os.environ.get('ANALYSIS_CACHE_DIR', os.path.join('cache', 'analysis')),
+    max_bytes=int(os.environ.get('ANALYSIS_CACHE_MAX_MB', 256)) * 1024 * 1024,
+    max_age=ANALYSIS_CACHE_TTL
+)
 
 # Error handling functions
 def get_error_status_code(error_type: ErrorType) -> int:
@@ -332,12 +619,143 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+class UploadRequest(Request):
+    """Request that spools multipart file uploads straight into the upload folder.
+    
+    Werkzeug's default keeps uploads in memory or an anonymous temp file, which
+    then has to be copied again by FileStorage.save(). Here each uploaded file
+    lands in a named file the route can parse in place; it is removed when the
+    request is closed.
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        stream = tempfile.NamedTemporaryFile(dir=app.config['UPLOAD_FOLDER'], delete=False)
+        self.__dict__.setdefault('_upload_paths', []).append(stream.name)
+        return stream
+    
+    def close(self):
+        super().close()
+        for path in self.__dict__.get('_upload_paths', ()):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+app.request_class = UploadRequest
+
+# Read size for streamed uploads
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Bullet markers counted in slide text
+BULLET_MARKERS = ('•', '·', '- ')
+
+def count_bullets(text: str) -> int:
+    """Count bullet markers with one C-level str.count scan per marker"""
+    return sum(text.count(marker) for marker in BULLET_MARKERS)
+
+# Fetches (name, color) from a run's font in one C-level call
+get_font_name_and_color = operator.attrgetter('name', 'color')
+
+# Slide counters incremented for each shape type
+SHAPE_TYPE_COUNTERS = {
+    MSO_SHAPE_TYPE.PICTURE: 'images',
+    MSO_SHAPE_TYPE.CHART: 'charts',
+    MSO_SHAPE_TYPE.TABLE: 'tables'
+}
+
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'ppt', 'pptx', 'doc', 'docx', 'pdf', 'txt'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# PDF text extraction backend: pypdfium2 when installed, PyPDF2 if forced or unavailable
+USE_PYPDF2 = os.environ.get('USE_PYPDF2', '0') == '1' or pdfium is None
+PDF_PARSE_METHOD = 'PyPDF2' if USE_PYPDF2 else 'pypdfium2'
+
+# PowerPoint extraction backend: streaming OOXML reader by default, python-pptx if disabled
+USE_XML_PARSER = os.environ.get('USE_XML_PARSER', '1') == '1'
+
+class MappedFile(mmap.mmap):
+    """Read-only memory map usable wherever parsers expect a seekable binary file"""
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def readable(self) -> bool:
+        return True
+
+def load_for_parsing(file_path):
+    """Return a read-only memory map of the file for parsers.
+    
+    Parsers read the upload straight from the page cache it was just written
+    to, instead of copying the whole file onto the heap first. Empty files
+    cannot be mapped and are returned as the path itself.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return file_path
+        return MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+@lru_cache(maxsize=256)
+def format_rgb(rgb) -> str:
+    """Format an RGB color as #RRGGBB (memoized, decks reuse a handful of colors)"""
+    if isinstance(rgb, tuple):
+        # RGBColor is a tuple of (r, g, b)
+        r, g, b = rgb
+        return f"#{r:02X}{g:02X}{b:02X}"
+    return f"#{int(rgb):06X}"
+
+@lru_cache(maxsize=64)
+def format_theme_color(theme_color) -> str:
+    """Format a theme color as theme_<NAME> (memoized)"""
+    return f"theme_{theme_color}"
+
+def format_font_color(color) -> Optional[str]:
+    """Color key for a run's font color, reading each color descriptor once.
+    
+    Returns #RRGGBB for RGB colors, theme_<NAME> for theme colors, or None.
+    """
+    try:
+        rgb = color.rgb
+    except AttributeError:
+        rgb = None
+    if rgb:
+        return format_rgb(rgb)
+    
+    try:
+        theme_color = color.theme_color
+    except AttributeError:
+        return None
+    return format_theme_color(theme_color) if theme_color else None
+
+class BoundedSet:
+    """Insertion-ordered set that ignores new items once it holds `cap` of them"""
+    
+    def __init__(self, cap: int):
+        self.cap = cap
+        self._items = {}
+    
+    @property
+    def full(self) -> bool:
+        return len(self._items) >= self.cap
+    
+    def add(self, item):
+        if len(self._items) < self.cap:
+            self._items[item] = None
+    
+    def update(self, items):
+        for item in items:
+            if len(self._items) >= self.cap:
+                return
+            self._items[item] = None
+    
+    def __len__(self):
+        return len(self._items)
+    
+    def __iter__(self):
+        return iter(self._items)
+
 class FileParser:
     """Enhanced file parser with better PPT parsing capabilities"""
     
@@ -361,10 +779,10 @@ class FileParser:
     def parse_powerpoint(self, file_path):
         """Enhanced PowerPoint parsing with detailed slide analysis and design elements"""
         try:
-            prs = Presentation(file_path)
+            prs = Presentation(load_for_parsing(file_path))
             
             slides_data = []
-            total_text = ""
+            slide_texts = []
             slide_count = len(prs.slides)
             
             # Track design elements across all slides
@@ -376,111 +794,97 @@ class FileParser:
             total_charts = 0
             total_tables = 0
             
-            for i, slide in enumerate(prs.slides):
-                slide_text = ""
-                slide_notes = ""
-                shapes_count = len(slide.shapes)
-                text_boxes = 0
-                images = 0
-                charts = 0
-                tables = 0
-                slide_colors = set()
-                slide_fonts = set()
+            # Layout proxies are shared between slides, so classify each layout once
+            layout_cache = {}
+            
+            # Fewer young-generation collections while thousands of shape proxies are allocated
+            with MemoryManager.gc_relaxed():
+                for i, slide in enumerate(prs.slides):
+                    slide_text_parts = []
+                    slide_notes = ""
+                    shapes_count = len(slide.shapes)
+                    text_boxes = 0
+                    shape_counts = {'images': 0, 'charts': 0, 'tables': 0}
+                    slide_colors = set()
+                    slide_fonts = set()
                 
-                # Extract slide notes
-                if slide.has_notes_slide and slide.notes_slide.notes_text_frame:
-                    slide_notes = slide.notes_slide.notes_text_frame.text
+                    # Extract slide notes
+                    if slide.has_notes_slide and slide.notes_slide.notes_text_frame:
+                        slide_notes = slide.notes_slide.notes_text_frame.text
                 
-                # Process shapes (text boxes, images, etc.)
-                for shape in slide.shapes:
-                    # Try multiple ways to extract text from shapes
-                    shape_text = ""
-                    
-                    # Method 1: Direct text attribute
-                    if hasattr(shape, 'text') and shape.text.strip():
-                        shape_text = shape.text.strip()
+                    # Process shapes (text boxes, images, etc.)
+                    for shape in slide.shapes:
+                        shape_text = ""
+                        shape_fonts = set()
+                        shape_colors = set()
                     
-                    # Method 2: Text frame approach (more reliable)
-                    elif hasattr(shape, 'text_frame') and shape.text_frame:
-                        for paragraph in shape.text_frame.paragraphs:
-                            if paragraph.text.strip():
-                                shape_text += paragraph.text.strip() + "\n"
-                    
-                    # Method 3: Try to get text from any text-like shape
-                    elif hasattr(shape, 'has_text_frame') and shape.has_text_frame:
-                        if shape.text_frame:
+                        # Single pass over the text frame: text, fonts and colors together
+                        if shape.has_text_frame:
+                            paragraph_texts = []
                             for paragraph in shape.text_frame.paragraphs:
-                                if paragraph.text.strip():
-                                    shape_text += paragraph.text.strip() + "\n"
+                                paragraph_texts.append(paragraph.text)
+                                for run in paragraph.runs:
+                                    # Extract font and color information with better error handling
+                                    try:
+                                        font_name, font_color = get_font_name_and_color(run.font)
+                                        if font_name:
+                                            shape_fonts.add(font_name)
+                                        
+                                        color_key = format_font_color(font_color)
+                                        if color_key:
+                                            shape_colors.add(color_key)
+                                    except Exception as font_error:
+                                        # Skip font/color extraction if it fails
+                                        logger.debug(f"Font extraction failed: {font_error}")
+                            shape_text = "\n".join(paragraph_texts).strip()
                     
-                    # If we found text, process it
-                    if shape_text.strip():
-                        slide_text += shape_text + "\n"
-                        text_boxes += 1
+                        # If we found text, process it
+                        if shape_text:
+                            slide_text_parts.append(shape_text)
+                            text_boxes += 1
                         
-                        # Count bullet points
-                        if '•' in shape_text or '·' in shape_text or '- ' in shape_text:
-                            bullet_points += shape_text.count('•') + shape_text.count('·') + shape_text.count('- ')
+                            # Count bullet points
+                            bullet_points += count_bullets(shape_text)
                         
-                        # Extract font information if available
-                        if hasattr(shape, 'text_frame') and shape.text_frame:
-                            for paragraph in shape.text_frame.paragraphs:
-                                if hasattr(paragraph, 'runs') and paragraph.runs:
-                                    for run in paragraph.runs:
-                                        if hasattr(run, 'font') and run.font.name:
-                                            slide_fonts.add(run.font.name)
-                                            all_fonts.add(run.font.name)
-                                        
-                                        # Extract color information with better error handling
-                                        if hasattr(run, 'font') and run.font.color:
-                                            try:
-                                                if hasattr(run.font.color, 'rgb'):
-                                                    color = run.font.color.rgb
-                                                    if color:
-                                                        slide_colors.add(f"#{color:06X}")
-                                                        all_colors.add(f"#{color:06X}")
-                                                elif hasattr(run.font.color, 'theme_color'):
-                                                    # Handle theme colors
-                                                    theme_color = run.font.color.theme_color
-                                                    if theme_color:
-                                                        slide_colors.add(f"theme_{theme_color}")
-                                                        all_colors.add(f"theme_{theme_color}")
-                                            except Exception as color_error:
-                                                # Skip color extraction if it fails
-                                                logger.debug(f"Color extraction failed: {color_error}")
-                                                pass
+                            slide_fonts |= shape_fonts
+                            slide_colors |= shape_colors
+                            continue
                     
-                    # Count other shape types
-                    elif shape.shape_type == 13:  # Picture
-                        images += 1
-                        total_images += 1
-                    elif shape.shape_type == 17:  # Chart
-                        charts += 1
-                        total_charts += 1
-                    elif shape.shape_type == 19:  # Table
-                        tables += 1
-                        total_tables += 1
+                        # Count other shape types
+                        counter_key = SHAPE_TYPE_COUNTERS.get(shape.shape_type)
+                        if counter_key:
+                            shape_counts[counter_key] += 1
                 
-                # Get layout information
-                layout_type = self._get_layout_type(slide)
-                all_layouts.add(layout_type)
+                    all_fonts |= slide_fonts
+                    all_colors |= slide_colors
+                    total_images += shape_counts['images']
+                    total_charts += shape_counts['charts']
+                    total_tables += shape_counts['tables']
                 
-                slide_data = {
-                    'slide_number': i + 1,
-                    'text_content': slide_text.strip(),
-                    'notes': slide_notes.strip(),
-                    'shapes_count': shapes_count,
-                    'text_boxes': text_boxes,
-                    'images': images,
-                    'charts': charts,
-                    'tables': tables,
-                    'layout_type': layout_type,
-                    'colors': list(slide_colors),
-                    'fonts': list(slide_fonts)
-                }
+                    slide_text = "\n".join(slide_text_parts)
+                
+                    # Get layout information
+                    layout_type = self._get_layout_type(slide, layout_cache)
+                    all_layouts.add(layout_type)
                 
-                slides_data.append(slide_data)
-                total_text += slide_text + "\n\n"
+                    slide_data = {
+                        'slide_number': i + 1,
+                        'text_content': slide_text,
+                        'notes': slide_notes.strip(),
+                        'shapes_count': shapes_count,
+                        'text_boxes': text_boxes,
+                        'images': shape_counts['images'],
+                        'charts': shape_counts['charts'],
+                        'tables': shape_counts['tables'],
+                        'layout_type': layout_type,
+                        'colors': list(slide_colors),
+                        'fonts': list(slide_fonts)
+                    }
+                
+                    slides_data.append(slide_data)
+                    slide_texts.append(slide_text)
+            
+            total_text = "\n\n".join(slide_texts)
             
             # Extract presentation metadata
             metadata = self._extract_presentation_metadata(prs)
@@ -561,20 +965,34 @@ class FileParser:
         else:
             return "low"
     
-    def _get_layout_type(self, slide):
-        """Determine slide layout type"""
+    def _get_layout_type(self, slide, layout_cache=None):
+        """Determine slide layout type, memoized per layout when a cache dict is given"""
         try:
-            layout_name = slide.slide_layout.name
-            if 'title' in layout_name.lower():
-                return 'title'
-            elif 'content' in layout_name.lower():
-                return 'content'
-            elif 'section' in layout_name.lower():
-                return 'section'
-            else:
-                return 'custom'
-        except:
+            slide_layout = slide.slide_layout
+        except (AttributeError, KeyError):
+            # Slide without a resolvable layout part
             return 'unknown'
+        
+        layout_id = id(slide_layout)
+        if layout_cache is not None and layout_id in layout_cache:
+            return layout_cache[layout_id]
+        
+        try:
+            layout_name = slide_layout.name.lower()
+            if 'title' in layout_name:
+                layout_type = 'title'
+            elif 'content' in layout_name:
+                layout_type = 'content'
+            elif 'section' in layout_name:
+                layout_type = 'section'
+            else:
+                layout_type = 'custom'
+        except AttributeError:
+            layout_type = 'unknown'
+        
+        if layout_cache is not None:
+            layout_cache[layout_id] = layout_type
+        return layout_type
     
     def _extract_presentation_metadata(self, prs):
         """Extract presentation metadata"""
@@ -604,13 +1022,15 @@ class FileParser:
                 metadata['category'] = core_props.category
             if core_props.comments:
                 metadata['comments'] = core_props.comments
-        except:
-            pass
+        except Exception as e:
+            logger.debug(f"Metadata extraction error: {e}")
         
         return metadata
     
     def parse_word(self, file_path):
         """Parse Word documents"""
+        import mammoth  # Imported on first use, only Word uploads need it
+        
         try:
             with open(file_path, 'rb') as docx_file:
                 result = mammoth.extractRawText(docx_file)
@@ -637,30 +1057,50 @@ class FileParser:
     def parse_pdf(self, file_path):
         """Parse PDF files"""
         try:
-            text_content = ""
-            with open(file_path, 'rb') as pdf_file:
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    text_content += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-                
-                metadata = {
-                    'page_count': len(pdf_reader.pages),
-                    'word_count': len(text_content.split()),
-                    'parse_method': 'PyPDF2'
-                }
-                
-                return {
-                    'slide_count': len(pdf_reader.pages),
-                    'text_content': text_content,
-                    'slides': [],
-                    'metadata': metadata
-                }
+            page_count = 0
+            page_texts = []
+            for page_num, page_text in self.iter_pdf_pages(file_path):
+                page_count = page_num + 1
+                page_texts.append(f"\n--- Page {page_count} ---\n{page_text}\n")
+            text_content = "".join(page_texts)
+            
+            metadata = {
+                'page_count': page_count,
+                'word_count': len(text_content.split()),
+                'parse_method': PDF_PARSE_METHOD
+            }
+            
+            return {
+                'slide_count': page_count,
+                'text_content': text_content,
+                'slides': [],
+                'metadata': metadata
+            }
         except Exception as e:
             logger.error(f"Error parsing PDF file: {str(e)}")
             raise ValueError(f"PDF parsing failed: {str(e)}")
     
+    def iter_pdf_pages(self, file_path):
+        """Lazily yield (page_index, text) for each PDF page"""
+        if USE_PYPDF2:
+            pdf_reader = PyPDF2.PdfReader(load_for_parsing(file_path))
+            for page_num, page in enumerate(pdf_reader.pages):
+                yield page_num, page.extract_text()
+            return
+        
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            for page_num in range(len(pdf)):
+                page = pdf[page_num]
+                text_page = page.get_textpage()
+                try:
+                    yield page_num, text_page.get_text_range()
+                finally:
+                    text_page.close()
+                    page.close()
+        finally:
+            pdf.close()
+    
     def parse_text(self, file_path):
         """Parse text files"""
         try:
@@ -684,49 +1124,370 @@ class FileParser:
             raise ValueError(f"Text file parsing failed: {str(e)}")
 
 
+# Shared worker pool for chunked slide processing
+parse_executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 2))
+atexit.register(parse_executor.shutdown)
+
+# Streaming OOXML reader
+class PptxXmlReader:
+    """Extract slide data directly from a .pptx package with lxml iterparse.
+    
+    Produces the same per-slide dicts as EnhancedFileParser without building
+    python-pptx object trees; each top-level shape is cleared once read.
+    """
+    
+    NS = {
+        'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+        'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+        'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+        'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+        'cp': 'http://schemas.openxmlformats.org/package/2006/metadata/core-properties',
+        'dc': 'http://purl.org/dc/elements/1.1/'
+    }
+    REL_SLIDE_LAYOUT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout'
+    REL_NOTES_SLIDE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide'
+    CHART_URI = 'http://schemas.openxmlformats.org/drawingml/2006/chart'
+    TABLE_URI = 'http://schemas.openxmlformats.org/drawingml/2006/table'
+    
+    _P = '{%s}' % NS['p']
+    _A = '{%s}' % NS['a']
+    SHAPE_TAGS = (_P + 'sp', _P + 'grpSp', _P + 'graphicFrame', _P + 'cxnSp', _P + 'pic', _P + 'contentPart')
+    SP_TREE = _P + 'spTree'
+    
+    def __init__(self, file_path: str):
+        self.package = zipfile.ZipFile(load_for_parsing(file_path))
+        self._layout_names = {}
+        self.slide_parts = self._list_slide_parts()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.package.close()
+    
+    def close(self):
+        self.package.close()
+    
+    def _read_xml(self, part_name: str):
+        return etree.fromstring(self.package.read(part_name))
+    
+    def _relationships(self, part_name: str) -> Dict[str, tuple]:
+        """Map rId -> (type, resolved part name) for a part's internal relationships"""
+        part_dir, base = posixpath.split(part_name)
+        rels_name = posixpath.join(part_dir, '_rels', base + '.rels')
+        try:
+            rels = self._read_xml(rels_name)
+        except KeyError:
+            return {}
+        
+        relationships = {}
+        for rel in rels.iterfind('rel:Relationship', self.NS):
+            if rel.get('TargetMode') == 'External':
+                continue
+            target = rel.get('Target')
+            # Absolute targets are package-rooted; only relative ones resolve against the part
+            if target.startswith('/'):
+                target = posixpath.normpath(target.lstrip('/'))
+            else:
+                target = posixpath.normpath(posixpath.join(part_dir, target))
+            relationships[rel.get('Id')] = (rel.get('Type'), target)
+        return relationships
+    
+    def _list_slide_parts(self) -> List[str]:
+        """Slide part names in presentation order"""
+        relationships = self._relationships('ppt/presentation.xml')
+        self._presentation = self._read_xml('ppt/presentation.xml')
+        rid_attr = '{%s}id' % self.NS['r']
+        return [
+            relationships[sld_id.get(rid_attr)][1]
+            for sld_id in self._presentation.iterfind('p:sldIdLst/p:sldId', self.NS)
+        ]
+    
+    def metadata(self) -> Dict:
+        """Presentation metadata in the shape of EnhancedFileParser's metadata"""
+        sld_sz = self._presentation.find('p:sldSz', self.NS)
+        metadata = {
+            'title': '',
+            'author': '',
+            'subject': '',
+            'total_slides': len(self.slide_parts),
+            'slide_width': int(sld_sz.get('cx')) if sld_sz is not None else None,
+            'slide_height': int(sld_sz.get('cy')) if sld_sz is not None else None
+        }
+        
+        try:
+            core = self._read_xml('docProps/core.xml')
+            metadata['title'] = core.findtext('dc:title', '', self.NS)
+            metadata['author'] = core.findtext('dc:creator', '', self.NS)
+            metadata['subject'] = core.findtext('dc:subject', '', self.NS)
+        except (KeyError, etree.XMLSyntaxError) as e:
+            logger.debug(f"Metadata extraction error: {e}")
+        
+        return metadata
+    
+    @classmethod
+    def _paragraph_text(cls, paragraph) -> str:
+        """Paragraph text as python-pptx reports it (runs and fields, line breaks as \\v)"""
+        parts = []
+        for child in paragraph:
+            tag = child.tag
+            if tag == cls._A + 'r' or tag == cls._A + 'fld':
+                parts.append(child.findtext(cls._A + 't') or '')
+            elif tag == cls._A + 'br':
+                parts.append('\v')
+        return ''.join(parts)
+    
+    @classmethod
+    def _text_frame_text(cls, tx_body) -> str:
+        return '\n'.join(cls._paragraph_text(p) for p in tx_body.iterfind(cls._A + 'p'))
+    
+    @classmethod
+    def _collect_formatting(cls, tx_body, colors: BoundedSet, fonts: BoundedSet):
+        """Record fonts and explicit fill colors from the run properties of a text body"""
+        for r_pr in tx_body.iterfind('a:p/a:r/a:rPr', cls.NS):
+            if colors.full and fonts.full:
+                return
+            
+            typeface = r_pr.find('a:latin', cls.NS)
+            if typeface is not None and typeface.get('typeface'):
+                fonts.add(typeface.get('typeface'))
+            
+            fill = r_pr.find('a:solidFill', cls.NS)
+            if fill is None or not len(fill):
+                continue
+            color = fill[0]
+            if color.tag == cls._A + 'srgbClr':
+                colors.add(f"#{color.get('val').upper()}")
+            elif color.tag == cls._A + 'schemeClr':
+                colors.add(format_theme_color(MSO_THEME_COLOR.from_xml(color.get('val'))))
+    
+    @classmethod
+    def _is_placeholder(cls, shape) -> bool:
+        return shape.find('*/p:nvPr/p:ph', cls.NS) is not None
+    
+    def _notes_text(self, part_name: str) -> str:
+        """Text of the body placeholder on a notes slide"""
+        notes = self._read_xml(part_name)
+        for shape in notes.iterfind('.//p:sp', self.NS):
+            ph = shape.find('p:nvSpPr/p:nvPr/p:ph', self.NS)
+            if ph is not None and ph.get('type') == 'body':
+                tx_body = shape.find('p:txBody', self.NS)
+                return self._text_frame_text(tx_body) if tx_body is not None else ''
+        return ''
+    
+    def _layout_name(self, part_name: str) -> str:
+        """Layout name, read once per layout part"""
+        name = self._layout_names.get(part_name)
+        if name is None:
+            c_sld = self._read_xml(part_name).find('p:cSld', self.NS)
+            name = self._layout_names[part_name] = c_sld.get('name', '') if c_sld is not None else ''
+        return name
+    
+    def read_slide_xml(self) -> List[bytes]:
+        """Decompress every slide part up front, in presentation order"""
+        return [self.package.read(part_name) for part_name in self.slide_parts]
+    
+    @classmethod
+    def count_shapes(cls, slide_xml: bytes) -> int:
+        """Count p:sp elements at any depth, matching python-pptx's .//p:sp xpath"""
+        count = 0
+        for _, shape in etree.iterparse(io.BytesIO(slide_xml), events=('end',), tag=cls._P + 'sp'):
+            count += 1
+            shape.clear()
+        return count
+    
+    def extract_slide(self, index: int, skip_formatting: bool = False, slide_xml: Optional[bytes] = None) -> Dict:
+        """Extract one slide (0-based index) into the chunked parser's slide dict.
+        
+        slide_xml may pass in the already decompressed slide part.
+        """
+        slide_number = index + 1
+        slide_data = {
+            'slide_number': slide_number,
+            'text_content': '',
+            'notes': '',
+            'shapes_count': 0,
+            'text_boxes': 0,
+            'images': 0,
+            'charts': 0,
+            'tables': 0,
+            'layout_type': 'unknown',
+            'colors': [],
+            'fonts': []
+        }
+        
+        try:
+            part_name = self.slide_parts[index]
+            slide_text = []
+            slide_colors = BoundedSet(10)
+            slide_fonts = BoundedSet(5)
+            
+            if slide_xml is None:
+                slide_xml = self.package.read(part_name)
+            
+            for _, shape in etree.iterparse(io.BytesIO(slide_xml), events=('end',), tag=self.SHAPE_TAGS):
+                # Group members are not counted as slide shapes; the group clears them
+                if shape.getparent().tag != self.SP_TREE:
+                    continue
+                    
+                slide_data['shapes_count'] += 1
+                tag = shape.tag
+                if tag == self._P + 'sp':
+                    tx_body = shape.find('p:txBody', self.NS)
+                    if tx_body is not None:
+                        text = self._text_frame_text(tx_body).strip()
+                        if text:
+                            slide_text.append(text)
+                            slide_data['text_boxes'] += 1
+                        if not skip_formatting and not (slide_colors.full and slide_fonts.full):
+                            self._collect_formatting(tx_body, slide_colors, slide_fonts)
+                elif tag == self._P + 'pic':
+                    if not self._is_placeholder(shape):
+                        slide_data['images'] += 1
+                elif tag == self._P + 'graphicFrame' and not self._is_placeholder(shape):
+                    graphic_data = shape.find('a:graphic/a:graphicData', self.NS)
+                    uri = graphic_data.get('uri') if graphic_data is not None else None
+                    if uri == self.CHART_URI:
+                        slide_data['charts'] += 1
+                    elif uri == self.TABLE_URI:
+                        slide_data['tables'] += 1
+                
+                # fast_iter: release the shape and the already read siblings before it
+                shape.clear()
+                sp_tree = shape.getparent()
+                while shape.getprevious() is not None:
+                    del sp_tree[0]
+            
+            slide_data['text_content'] = '\n'.join(slide_text)
+            slide_data['colors'] = list(slide_colors)
+            slide_data['fonts'] = list(slide_fonts)
+            
+            for rel_type, target in self._relationships(part_name).values():
+                if rel_type == self.REL_SLIDE_LAYOUT:
+                    slide_data['layout_type'] = self._layout_name(target)
+                elif rel_type == self.REL_NOTES_SLIDE:
+                    try:
+                        slide_data['notes'] = self._notes_text(target)
+                    except (KeyError, etree.XMLSyntaxError) as e:
+                        logger.debug(f"Notes extraction failed: {e}")
+        
+        except Exception as e:
+            logger.error(f"Error processing slide {slide_number}: {e}")
+        
+        return slide_data
+
 class EnhancedFileParser:
     """Enhanced PowerPoint parser with chunking and parallel processing"""
     
+    REDUCED_FEATURES_SIZE = 100 * 1024 * 1024  # Skip formatting above 100MB
+    TEXT_ONLY_SHAPE_COUNT = 5000  # Extract text only above this many shapes
+    
     def __init__(self, chunk_size: int = 10):
         self.chunk_size = chunk_size
-        self.executor = ThreadPoolExecutor(max_workers=4)
         self.skip_formatting = False # New flag to skip formatting extraction
         
     def parse_powerpoint_chunked(self, file_path: str) -> Dict[str, Any]:
         """Parse large PowerPoint files with chunking and streaming"""
         try:
-            prs = Presentation(file_path)
-            total_slides = len(prs.slides)
-            
-            # Process metadata first
-            metadata = self._extract_presentation_metadata_safe(prs)
-            
-            # Process slides in chunks
-            slides_data = []
-            for chunk_start in range(0, total_slides, self.chunk_size):
-                chunk_end = min(chunk_start + self.chunk_size, total_slides)
-                chunk_data = self._process_slide_chunk(
-                    prs, chunk_start, chunk_end
-                )
-                slides_data.extend(chunk_data)
-                
-                # Yield progress for streaming (optional)
-                progress = (chunk_end / total_slides) * 100
-                logger.info(f"Processing progress: {progress:.1f}%")
+            if USE_XML_PARSER:
+                try:
+                    return self._parse_with_xml_reader(file_path)
+                except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as e:
+                    logger.warning(f"Streaming XML parse failed, falling back to python-pptx: {e}")
             
-            # Aggregate results
-            return self._aggregate_results(slides_data, metadata, total_slides)
+            prs = Presentation(load_for_parsing(file_path))
+            # python-pptx already parsed every slide part; count shapes on those trees
+            shape_count = sum(len(slide._element.xpath('.//p:sp')) for slide in prs.slides)
+            strategy = self._apply_strategy(file_path, shape_count)
+            if strategy == 'text_only':
+                return ErrorHandler._parse_text_only(prs)
+            return self._parse_from_prs(prs)
             
         except Exception as e:
             logger.error(f"Error parsing PowerPoint: {str(e)}")
             raise ValueError(f"PowerPoint parsing failed: {str(e)}")
     
-    def _process_slide_chunk(self, prs, start_idx: int, end_idx: int) -> List[Dict]:
+    def _choose_strategy(self, file_path: str, shape_count: int) -> str:
+        """Pick 'full', 'reduced' or 'text_only' parsing from the deck's shape count and size"""
+        if shape_count > self.TEXT_ONLY_SHAPE_COUNT:
+            return 'text_only'
+        if os.path.getsize(file_path) > self.REDUCED_FEATURES_SIZE:
+            return 'reduced'
+        return 'full'
+    
+    def _apply_strategy(self, file_path: str, shape_count: int) -> str:
+        """Choose the parsing strategy, log it and set skip_formatting for 'reduced'"""
+        strategy = self._choose_strategy(file_path, shape_count)
+        if strategy != 'full':
+            logger.info(f"Using {strategy} parsing strategy for {os.path.basename(file_path)}")
+        if strategy == 'reduced':
+            self.skip_formatting = True
+        return strategy
+    
+    def _parse_from_prs(self, prs) -> Dict[str, Any]:
+        """Parse an already opened Presentation in chunks"""
+        total_slides = len(prs.slides)
+        
+        # Process metadata first
+        metadata = self._extract_presentation_metadata_safe(prs)
+        
+        # Resolve every slide up front so worker threads only read parsed trees
+        slides = list(prs.slides)
+        
+        # Process slides in chunks in parallel
+        futures = [
+            (chunk_start, parse_executor.submit(
+                self._process_slide_chunk,
+                slides, chunk_start, min(chunk_start + self.chunk_size, total_slides)
+            ))
+            for chunk_start in range(0, total_slides, self.chunk_size)
+        ]
+        
+        slides_data = []
+        for chunk_start, future in futures:
+            slides_data.extend(future.result())
+            
+            # Yield progress for streaming (optional)
+            chunk_end = min(chunk_start + self.chunk_size, total_slides)
+            progress = (chunk_end / total_slides) * 100
+            logger.info(f"Processing progress: {progress:.1f}%")
+        
+        # Aggregate results
+        return self._aggregate_results(slides_data, metadata, total_slides)
+    
+    def _parse_with_xml_reader(self, file_path: str) -> Dict[str, Any]:
+        """Parse straight from the slide XML parts without building python-pptx objects"""
+        with PptxXmlReader(file_path) as reader:
+            # Decompress once; the strategy probe and the parse both read these bytes
+            slide_xml = reader.read_slide_xml()
+            strategy = self._apply_strategy(file_path, sum(map(reader.count_shapes, slide_xml)))
+            if strategy == 'text_only':
+                return {
+                    'slide_count': len(reader.slide_parts),
+                    'text_content': '\n\n'.join(
+                        reader.extract_slide(index, True, xml)['text_content'] for index, xml in enumerate(slide_xml)
+                    ),
+                    'metadata': {'parse_method': 'text_only_fallback'},
+                    'slides': []
+                }
+            
+            metadata = reader.metadata()
+            skip_formatting = self.skip_formatting
+            
+            # Parse the independent slide parts across the worker threads
+            slides_data = list(parse_executor.map(
+                lambda index: reader.extract_slide(index, skip_formatting, slide_xml[index]),
+                range(metadata['total_slides'])
+            ))
+        
+        return self._aggregate_results(slides_data, metadata, metadata['total_slides'])
+    
+    def _process_slide_chunk(self, slides: List, start_idx: int, end_idx: int) -> List[Dict]:
         """Process a chunk of slides"""
         chunk_results = []
         
         for i in range(start_idx, end_idx):
-            slide = prs.slides[i]
+            slide = slides[i]
             slide_data = self._process_single_slide_safe(slide, i + 1)
             chunk_results.append(slide_data)
             
@@ -751,56 +1512,61 @@ class EnhancedFileParser:
         try:
             # Extract text content safely
             slide_text = []
-            slide_colors = set()
-            slide_fonts = set()
+            slide_colors = BoundedSet(10)  # Limit colors
+            slide_fonts = BoundedSet(5)  # Limit fonts
             
             # Get slide notes safely
             try:
-                if hasattr(slide, 'has_notes_slide') and slide.has_notes_slide:
-                    if hasattr(slide.notes_slide, 'notes_text_frame'):
-                        slide_data['notes'] = slide.notes_slide.notes_text_frame.text
+                if slide.has_notes_slide:
+                    slide_data['notes'] = slide.notes_slide.notes_text_frame.text
             except Exception as e:
                 logger.debug(f"Notes extraction failed: {e}")
             
             # Process shapes with timeout protection
-            slide_data['shapes_count'] = len(slide.shapes) if hasattr(slide, 'shapes') else 0
+            shapes = slide.shapes
+            slide_data['shapes_count'] = len(shapes)
             
-            for shape in slide.shapes:
+            skip_formatting = self.skip_formatting
+            
+            # Hot loop: bind methods and counters to locals, write back once
+            append_text = slide_text.append
+            extract_text_and_formatting = self._extract_text_and_formatting
+            counter_for = SHAPE_TYPE_COUNTERS.get
+            type_counts = {'images': 0, 'charts': 0, 'tables': 0}
+            text_boxes = 0
+            
+            for shape in shapes:
                 try:
-                    # Extract text safely
-                    if hasattr(shape, 'has_text_frame') and shape.has_text_frame:
-                        if shape.text_frame:
-                            text = self._extract_text_from_shape(shape)
-                            if text:
-                                slide_text.append(text)
-                                slide_data['text_boxes'] += 1
+                    # Extract text, and formatting in the same paragraph walk
+                    if shape.has_text_frame:
+                        if skip_formatting:
+                            # Reduced mode: take the frame text in one go, no run walk
+                            text = shape.text_frame.text.strip()
+                        else:
+                            text = extract_text_and_formatting(shape, slide_colors, slide_fonts)
+                        if text:
+                            append_text(text)
+                            text_boxes += 1
                     
                     # Count shape types safely
-                    if hasattr(shape, 'shape_type'):
-                        shape_type = shape.shape_type
-                        if shape_type == 13:  # Picture
-                            slide_data['images'] += 1
-                        elif shape_type == 17:  # Chart
-                            slide_data['charts'] += 1
-                        elif shape_type == 19:  # Table
-                            slide_data['tables'] += 1
-                    
-                    # Extract colors and fonts with better error handling
-                    self._extract_shape_formatting_safe(shape, slide_colors, slide_fonts)
+                    counter_key = counter_for(shape.shape_type)
+                    if counter_key:
+                        type_counts[counter_key] += 1
                     
                 except Exception as shape_error:
                     logger.debug(f"Shape processing error: {shape_error}")
                     continue
             
+            slide_data['text_boxes'] = text_boxes
+            slide_data.update(type_counts)
             slide_data['text_content'] = '\n'.join(slide_text)
-            slide_data['colors'] = list(slide_colors)[:10]  # Limit colors
-            slide_data['fonts'] = list(slide_fonts)[:5]  # Limit fonts
+            slide_data['colors'] = list(slide_colors)
+            slide_data['fonts'] = list(slide_fonts)
             
             # Get layout type safely
             try:
-                if hasattr(slide, 'slide_layout') and hasattr(slide.slide_layout, 'name'):
-                    slide_data['layout_type'] = slide.slide_layout.name
-            except:
+                slide_data['layout_type'] = slide.slide_layout.name
+            except AttributeError:
                 pass
                 
         except Exception as e:
@@ -808,66 +1574,35 @@ class EnhancedFileParser:
             
         return slide_data
     
-    def _extract_text_from_shape(self, shape) -> str:
-        """Safely extract text from a shape"""
-        text_parts = []
-        try:
-            if hasattr(shape, 'text_frame') and shape.text_frame:
-                for paragraph in shape.text_frame.paragraphs:
-                    if hasattr(paragraph, 'text'):
-                        text_parts.append(paragraph.text)
-        except Exception as e:
-            logger.debug(f"Text extraction error: {e}")
+    def _extract_text_and_formatting(self, shape, colors: BoundedSet, fonts: BoundedSet) -> str:
+        """Extract a text shape's text and its fonts/colors in one pass over the paragraphs.
         
-        return '\n'.join(text_parts).strip()
-    
-    def _extract_shape_formatting_safe(self, shape, colors: set, fonts: set):
-        """Safely extract formatting information"""
+        Runs are only visited for formatting until both sets are full.
+        """
+        text_parts = []
         try:
-            if not hasattr(shape, 'text_frame') or not shape.text_frame:
-                return
-                
             for paragraph in shape.text_frame.paragraphs:
-                if not hasattr(paragraph, 'runs'):
+                text_parts.append(paragraph.text)
+                
+                if colors.full and fonts.full:
                     continue
-                    
                 for run in paragraph.runs:
-                    # Extract font safely
-                    try:
-                        if hasattr(run, 'font') and hasattr(run.font, 'name'):
-                            if run.font.name:
-                                fonts.add(run.font.name)
-                    except:
-                        pass
-                    
-                    # Extract color safely - simplified approach
+                    # Extract font and color safely - simplified approach
                     try:
-                        if hasattr(run, 'font') and hasattr(run.font, 'color'):
-                            color_obj = run.font.color
-                            
-                            # Try RGB color
-                            if hasattr(color_obj, 'rgb') and color_obj.rgb:
-                                try:
-                                    # Handle RGBColor object
-                                    if hasattr(color_obj.rgb, '__iter__'):
-                                        # It's already an RGB tuple
-                                        r, g, b = color_obj.rgb
-                                        colors.add(f"#{r:02X}{g:02X}{b:02X}")
-                                    else:
-                                        # It might be an integer
-                                        rgb_int = int(color_obj.rgb)
-                                        colors.add(f"#{rgb_int:06X}")
-                                except (ValueError, TypeError, AttributeError):
-                                    pass
-                            
-                            # Try theme color
-                            elif hasattr(color_obj, 'theme_color') and color_obj.theme_color:
-                                colors.add(f"theme_{color_obj.theme_color}")
-                    except:
-                        pass
+                        font_name, color_obj = get_font_name_and_color(run.font)
+                        if font_name:
+                            fonts.add(font_name)
                         
+                        color_key = format_font_color(color_obj)
+                        if color_key:
+                            colors.add(color_key)
+                    except (AttributeError, TypeError, ValueError):
+                        # Run without readable font/color properties
+                        pass
         except Exception as e:
-            logger.debug(f"Formatting extraction error: {e}")
+            logger.debug(f"Text extraction error: {e}")
+        
+        return '\n'.join(text_parts).strip()
     
     def _extract_presentation_metadata_safe(self, prs) -> Dict:
         """Safely extract presentation metadata"""
@@ -895,31 +1630,33 @@ class EnhancedFileParser:
         """Aggregate slide data into final result"""
         # Collect all text
         all_text = []
-        all_colors = set()
-        all_fonts = set()
+        all_colors = BoundedSet(20)  # Limit to 20 colors
+        all_fonts = BoundedSet(10)  # Limit to 10 fonts
         total_images = 0
         total_charts = 0
         total_tables = 0
-        bullet_points = 0
+        total_shapes = 0
         
         for slide in slides_data:
             if slide['text_content']:
                 all_text.append(slide['text_content'])
-                # Count bullet points
-                bullet_points += slide['text_content'].count('•')
-                bullet_points += slide['text_content'].count('·')
-                bullet_points += slide['text_content'].count('- ')
             
             all_colors.update(slide.get('colors', []))
             all_fonts.update(slide.get('fonts', []))
             total_images += slide.get('images', 0)
             total_charts += slide.get('charts', 0)
             total_tables += slide.get('tables', 0)
+            total_shapes += slide.get('shapes_count', 0)
+        
+        text_content = '\n\n'.join(all_text)
+        
+        # Count bullet points over the whole deck at once
+        bullet_points = count_bullets(text_content)
         
         # Update metadata
         metadata.update({
-            'colors': list(all_colors)[:20],  # Limit to 20 colors
-            'fonts': list(all_fonts)[:10],  # Limit to 10 fonts
+            'colors': list(all_colors),
+            'fonts': list(all_fonts),
             'bullet_point_count': bullet_points,
             'total_images': total_images,
             'total_charts': total_charts,
@@ -927,24 +1664,21 @@ class EnhancedFileParser:
             'has_images': total_images > 0,
             'has_charts': total_charts > 0,
             'has_tables': total_tables > 0,
-            'design_complexity': self._assess_design_complexity(slides_data),
-            'content_density': self._assess_content_density('\n'.join(all_text), total_slides)
+            'design_complexity': self._assess_design_complexity(total_shapes, len(slides_data)),
+            'content_density': self._assess_content_density(len(text_content.split()), total_slides)
         })
         
         return {
             'slide_count': total_slides,
-            'text_content': '\n\n'.join(all_text),
+            'text_content': text_content,
             'slides': slides_data,
             'metadata': metadata,
             'parse_method': 'Enhanced chunked parsing with error handling'
         }
     
-    def _assess_design_complexity(self, slides_data: List[Dict]) -> str:
+    def _assess_design_complexity(self, total_shapes: int, slide_count: int) -> str:
         """Assess design complexity based on slide elements"""
-        total_elements = sum(
-            slide.get('shapes_count', 0) for slide in slides_data
-        )
-        avg_elements = total_elements / len(slides_data) if slides_data else 0
+        avg_elements = total_shapes / slide_count if slide_count else 0
         
         if avg_elements > 15:
             return 'high'
@@ -953,12 +1687,12 @@ class EnhancedFileParser:
         else:
             return 'low'
     
-    def _assess_content_density(self, text: str, slide_count: int) -> str:
+    def _assess_content_density(self, word_count: int, slide_count: int) -> str:
         """Assess content density"""
         if slide_count == 0:
             return 'low'
             
-        words_per_slide = len(text.split()) / slide_count
+        words_per_slide = word_count / slide_count
         
         if words_per_slide > 100:
             return 'high'
@@ -968,24 +1702,41 @@ class EnhancedFileParser:
             return 'low'
 
 
-class OpenAIService:
-    """OpenAI service for design analysis"""
-    
-    def __init__(self, api_key):
-        self.api_key = api_key
-        openai.api_key = api_key
-    
-    def analyze_design(self, content, company_context="", audience_info=None):
-        """Analyze design using OpenAI GPT-4"""
-        try:
-            prompt = self._create_design_compass_prompt(content, company_context, audience_info)
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a senior presentation design consultant following "The Presentation Design Compass" methodology. You help designers move from strategy to design through a 5-stage framework:
+@lru_cache(maxsize=None)
+def get_openai():
+    """Import the OpenAI SDK on first use; only the analysis and chat routes need it"""
+    import openai
+    return openai
+
+# Model for the structured design/slide analyses; JSON mode guarantees a parseable object
+ANALYSIS_MODEL = os.environ.get('OPENAI_ANALYSIS_MODEL', 'gpt-4o-mini')
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# JSON parser for model responses; orjson errors subclass json.JSONDecodeError
+loads_json = orjson.loads if orjson is not None else json.loads
+
+def dumps_json(value) -> str:
+    """Serialize a value to a JSON string, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+def dumps_json_bytes(value, indent: bool = False) -> bytes:
+    """Serialize a value to UTF-8 JSON bytes, optionally indented by two spaces"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(value, indent=2 if indent else None).encode()
+
+def json_response(value):
+    """JSON response serialized in one call (jsonify goes through the stdlib encoder)"""
+    return app.response_class(dumps_json_bytes(value), mimetype='application/json')
+
+def strip_code_fence(text: str) -> str:
+    """Strip a surrounding ```json ... ``` markdown fence from a model response"""
+    return text.strip().removeprefix('```json').removeprefix('```').removesuffix('```').strip()
+
+# System messages sent with every analysis request
+_DESIGN_SYSTEM_MSG = """You are a senior presentation design consultant following "The Presentation Design Compass" methodology. You help designers move from strategy to design through a 5-stage framework:
 
 1. Understand the context (contextual grounding)
 2. Set the ambitions (clarify expectations) 
@@ -1000,38 +1751,8 @@ You classify presentations into 4 types:
 - Informative & Educational: Clear, helpful, structured for explanation
 
 Always respond with valid JSON only. Consider presentation type when making design recommendations."""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=3000,
-                temperature=0.7
-            )
-            
-            analysis_text = response.choices[0].message.content
-            
-            # Clean and parse JSON response
-            cleaned_response = analysis_text.replace('```json\n', '').replace('```\n', '').strip()
-            
-            return json.loads(cleaned_response)
-            
-        except Exception as e:
-            logger.error(f"OpenAI analysis error: {str(e)}")
-            raise ValueError(f"Analysis failed: {str(e)}")
-    
-    def analyze_slide(self, slide_data, presentation_context, audience_info, slide_number):
-        """Analyze individual slide with detailed recommendations"""
-        try:
-            prompt = self._create_slide_analysis_prompt(slide_data, presentation_context, audience_info, slide_number)
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert presentation design consultant specializing in slide-by-slide analysis. You provide detailed, actionable recommendations for individual slides that help designers create compelling, effective presentations.
+
+_SLIDE_SYSTEM_MSG = """You are an expert presentation design consultant specializing in slide-by-slide analysis. You provide detailed, actionable recommendations for individual slides that help designers create compelling, effective presentations.
 
 Your expertise includes:
 - Slide layout optimization and visual hierarchy
@@ -1042,148 +1763,97 @@ Your expertise includes:
 - Technical design principles and best practices
 
 IMPORTANT: Always respond with valid JSON format. Do not include any text outside the JSON structure."""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=2000,
-                temperature=0.7
-            )
-            
-            analysis_text = response.choices[0].message.content
-            
-            # Clean and parse JSON response with better error handling
-            try:
-                # Remove markdown code blocks if present
-                cleaned_response = analysis_text.replace('```json\n', '').replace('```\n', '').replace('```json', '').replace('```', '').strip()
-                
-                # Try to parse the JSON
-                return json.loads(cleaned_response)
-                
-            except json.JSONDecodeError as json_error:
-                logger.error(f"JSON parsing error: {json_error}")
-                logger.error(f"Raw response: {analysis_text}")
-                
-                # Return a fallback analysis structure
-                return {
-                    "slideOverview": {
-                        "slideNumber": slide_number,
-                        "contentSummary": "Analysis failed - please try again",
-                        "slidePurpose": "Unable to determine",
-                        "effectiveness": "unknown",
-                        "priority": "unknown"
-                    },
-                    "contentAnalysis": {
-                        "textContent": {
-                            "clarity": "Unable to analyze",
-                            "organization": "Unable to analyze",
-                            "length": "unknown",
-                            "keyMessages": ["Analysis failed"],
-                            "improvements": ["Please try analyzing this slide again"]
-                        },
-                        "visualElements": {
-                            "images": {
-                                "count": slide_data.get('images', 0),
-                                "relevance": "Unable to analyze",
-                                "quality": "unknown",
-                                "recommendations": ["Please try again"]
-                            },
-                            "charts": {
-                                "count": slide_data.get('charts', 0),
-                                "effectiveness": "Unable to analyze",
-                                "clarity": "Unable to analyze",
-                                "improvements": ["Please try again"]
-                            },
-                            "tables": {
-                                "count": slide_data.get('tables', 0),
-                                "readability": "Unable to analyze",
-                                "structure": "Unable to analyze",
-                                "improvements": ["Please try again"]
-                            }
-                        }
-                    },
-                    "designRecommendations": {
-                        "layout": {
-                            "currentLayout": slide_data.get('layout_type', 'unknown'),
-                            "effectiveness": "Unable to analyze",
-                            "recommendedLayout": "Unable to determine",
-                            "specificChanges": ["Please try analyzing this slide again"],
-                            "visualHierarchy": "Unable to analyze"
-                        },
-                        "colorScheme": {
-                            "currentColors": slide_data.get('colors', []),
-                            "recommendations": ["Unable to analyze"],
-                            "contrast": "Unable to analyze",
-                            "accessibility": "Unable to analyze"
-                        },
-                        "typography": {
-                            "currentFonts": slide_data.get('fonts', []),
-                            "readability": "Unable to analyze",
-                            "recommendations": ["Unable to analyze"],
-                            "hierarchy": "Unable to analyze"
-                        }
-                    },
-                    "actionItems": {
-                        "immediate": ["Try analyzing this slide again"],
-                        "shortTerm": ["Contact support if issue persists"],
-                        "longTerm": ["Consider manual review"]
-                    },
-                    "error": "JSON parsing failed - please try again"
-                }
-            
-        except Exception as e:
-            logger.error(f"OpenAI slide analysis error: {str(e)}")
-            raise ValueError(f"Slide analysis failed: {str(e)}")
-    
-    def _create_design_compass_prompt(self, content, company_context, audience_info=None):
-        """Create the design compass analysis prompt"""
-        
-        # Build content sections
-        slide_count_text = ""
-        if content.get('slide_count'):
-            slide_count_text = f"Slide Count: {content['slide_count']}"
-        
-        colors_text = ""
-        if content.get('metadata', {}).get('colors'):
-            colors_text = f"Current Colors: {', '.join(content['metadata']['colors'])}"
-        
-        fonts_text = ""
-        if content.get('metadata', {}).get('fonts'):
-            fonts_text = f"Fonts: {', '.join(content['metadata']['fonts'])}"
-        
-        images_text = ""
-        if content.get('metadata', {}).get('has_images'):
-            images_text = f"Has Images: {content['metadata']['has_images']}"
-        
-        bullets_text = ""
-        if content.get('metadata', {}).get('bullet_point_count'):
-            bullets_text = f"Bullet Points: {content['metadata']['bullet_point_count']}"
-        
-        company_text = ""
-        if company_context:
-            company_text = f"COMPANY DESIGN GUIDELINES:\n{company_context}\n"
-        
-        audience_text = ""
-        if audience_info:
-            retainer_client = audience_info.get('retainer_client', '')
-            retainer_info = f"- Retainer Client: {retainer_client}" if retainer_client else ""
-            
-            audience_text = f"""AUDIENCE INFORMATION:
-- Type: {audience_info.get('type', 'Not specified')}
-- Goal: {audience_info.get('goal', 'Not specified')}
-- Size: {audience_info.get('size', 'Not specified')}
-- Additional Context: {audience_info.get('context', 'None provided')}
-{retainer_info}
 
+# Chat assistant system prompt, identical on every /chat request
+_CHAT_SYSTEM_MSG = """You are an expert presentation design consultant with deep knowledge of "The Presentation Design Compass" methodology. You help designers create compelling presentations that achieve their strategic goals.
+
+Your expertise includes:
+- Strategic presentation planning and audience analysis
+- Color theory and visual design principles
+- Typography and layout optimization
+- Storytelling and narrative structure
+- Brand integration and visual hierarchy
+- Technical specifications and delivery considerations
+
+Always provide specific, actionable advice based on the analysis context. Be encouraging but direct, and focus on practical improvements that will have the most impact."""
+
+_CHAT_ANALYSIS_SUMMARY_TEMPLATE = """PRESENTATION ANALYSIS SUMMARY:
+- Type: {presentation_type}
+- Strategic Goal: {strategic_goal}
+- Audience: {audience}
+- Key Design Elements: {design_elements}
+- Priority Issues: {priority_issues}
 """
-        
-        return f"""Following "The Presentation Design Compass" methodology, analyze this presentation comprehensively:
+
+_CHAT_QUESTION_TEMPLATE = """USER QUESTION: {message}
+
+Please provide a helpful, specific response about their presentation design. Focus on practical advice and actionable insights. If they're asking about specific aspects of the analysis, reference the relevant data. If they need clarification on any design principles, explain them clearly."""
+
+# Token budget for the conversation history sent with each /chat request
+CHAT_HISTORY_TOKEN_BUDGET = 3000
+
+@lru_cache(maxsize=None)
+def get_token_encoder():
+    """tiktoken encoder for the chat model, or None when tiktoken is unavailable"""
+    try:
+        import tiktoken  # Optional, imported on first use like the OpenAI SDK
+        return tiktoken.encoding_for_model('gpt-4')
+    except Exception as e:
+        logger.info(f"tiktoken unavailable, estimating token counts: {e}")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Token count of text for the chat model (about 4 characters per token without tiktoken)"""
+    encoder = get_token_encoder()
+    if encoder is None:
+        return len(text) // 4 + 1
+    return len(encoder.encode(text))
+
+def trim_history_to_budget(history, budget: int = CHAT_HISTORY_TOKEN_BUDGET) -> list:
+    """Keep the most recent messages whose combined content fits in budget tokens"""
+    kept = []
+    used = 0
+    for msg in reversed(history):
+        used += count_tokens(str(msg.get('content', '')))
+        if used > budget:
+            break
+        kept.append(msg)
+    kept.reverse()
+    return kept
+
+# Analysis fields shown in the /chat summary: (template field, key path, default when missing)
+_CHAT_SUMMARY_FIELDS = (
+    ('presentation_type', ('presentationType', 'primary'), 'Unknown'),
+    ('strategic_goal', ('strategicDirection', 'primaryStrategy'), 'Not specified'),
+    ('audience', ('contextualGrounding', 'audienceProfile'), 'Not specified'),
+)
+_CHAT_PRIMARY_COLORS_PATH = ('designDirection', 'colors', 'primary')
+_CHAT_PRIORITY_FIXES_PATH = ('executionGuidance', 'priorityFixes')
+
+def get_path(value, path: tuple, default=None):
+    """Follow a key path through nested dicts, returning default at the first missing key"""
+    for key in path:
+        try:
+            value = value[key]
+        except (KeyError, TypeError):
+            return default
+    return value
+
+def _chat_analysis_summary(analysis) -> str:
+    """Condensed analysis context for /chat, walking each precompiled key path once"""
+    fields = {name: get_path(analysis, path, default) for name, path, default in _CHAT_SUMMARY_FIELDS}
+    primary_colors = get_path(analysis, _CHAT_PRIMARY_COLORS_PATH)
+    priority_fixes = get_path(analysis, _CHAT_PRIORITY_FIXES_PATH)
+    fields['design_elements'] = ', '.join(primary_colors[:3]) if primary_colors else 'Not specified'
+    fields['priority_issues'] = ', '.join(priority_fixes[:2]) if priority_fixes else 'Not specified'
+    return _CHAT_ANALYSIS_SUMMARY_TEMPLATE.format_map(fields)
+
+# Variable part of the design compass prompt; the JSON schema below is appended verbatim
+_DESIGN_PROMPT_HEADER = """Following "The Presentation Design Compass" methodology, analyze this presentation comprehensively:
 
 DOCUMENT CONTENT:
 {slide_count_text}
-Text Content: {content.get('text_content', '')}
+Text Content: {text_content}
 {colors_text}
 {fonts_text}
 {images_text}
@@ -1194,21 +1864,23 @@ Text Content: {content.get('text_content', '')}
 
 Provide a comprehensive design analysis with specific strategic direction, color palettes, and design elements. Respond with this detailed JSON structure:
 
-{{
-  "presentationType": {{
+"""
+
+_DESIGN_SCHEMA = """{
+  "presentationType": {
     "primary": "Executive & Strategic | Sales & Influence | Engagement & Immersion | Informative & Educational",
     "secondary": "optional secondary type or null",
     "reasoning": "detailed explanation of why this classification based on content analysis",
     "confidence": "high | medium | low"
-  }},
-  "strategicDirection": {{
+  },
+  "strategicDirection": {
     "primaryStrategy": "specific strategic approach (e.g., 'Data-driven executive summary for board approval')",
     "communicationGoal": "what the presentation should achieve",
     "audienceEngagement": "how to engage the specific audience",
     "callToAction": "what action should the audience take",
     "successMetrics": ["how to measure presentation success"]
-  }},
-  "contextualGrounding": {{
+  },
+  "contextualGrounding": {
     "identifiedObjective": "persuade | inform | align | inspire",
     "audienceProfile": "detailed description of likely audience including their role, background, and expectations",
     "presentationTrigger": "why this presentation exists now - the business context",
@@ -1216,36 +1888,36 @@ Provide a comprehensive design analysis with specific strategic direction, color
     "urgencyLevel": "high | medium | low",
     "politicalClimate": "any sensitivities or dynamics detected",
     "businessContext": "industry, market conditions, and organizational context"
-  }},
-  "designDirection": {{
-    "backgrounds": {{
+  },
+  "designDirection": {
+    "backgrounds": {
       "recommended": "White/Light | Dark | Colored | Textured/Thematic | Gradient | Minimal",
       "specificRecommendations": ["detailed background suggestions"],
       "reasoning": "why this background approach fits the presentation type and audience",
       "examples": ["specific background styles to consider"]
-    }},
-    "layouts": {{
+    },
+    "layouts": {
       "recommended": "Structured & repetitive | Dynamic & alternating | Asymmetrical | Full-screen visuals | Grid-based | Free-form",
       "specificRecommendations": ["detailed layout suggestions"],
       "reasoning": "how this supports the content and audience",
       "slideStructure": ["specific slide layout recommendations"]
-    }},
-    "imagery": {{
+    },
+    "imagery": {
       "recommended": "Photography | Illustration | 3D/isometric | Hybrid | None | Icons | Charts",
       "specificRecommendations": ["detailed imagery suggestions"],
       "reasoning": "why this imagery approach works for this type",
       "imageStyle": "specific image style recommendations",
       "chartTypes": ["recommended chart types if data is present"]
-    }},
-    "fonts": {{
+    },
+    "fonts": {
       "headings": "specific font recommendation with reasoning",
       "body": "specific font recommendation with reasoning", 
       "accent": "accent font for highlights",
       "reasoning": "how typography supports presentation type and tone",
       "fontPairings": ["recommended font combinations"],
       "sizing": "font size recommendations"
-    }},
-    "colors": {{
+    },
+    "colors": {
       "primary": ["#specific color codes with names"],
       "secondary": ["#specific color codes with names"],
       "accent": ["#accent color codes"],
@@ -1254,25 +1926,25 @@ Provide a comprehensive design analysis with specific strategic direction, color
       "colorPsychology": "detailed explanation of color choices and their psychological impact",
       "accessibility": "color contrast and accessibility considerations",
       "brandAlignment": "how colors align with brand guidelines"
-    }},
-    "visualMetaphors": {{
+    },
+    "visualMetaphors": {
       "recommended": "specific metaphor suggestions based on content",
       "transformationTheme": "what's changing from → to",
       "reasoning": "how metaphors support the story",
       "visualElements": ["specific visual elements to include"]
-    }},
-    "spacing": {{
+    },
+    "spacing": {
       "recommended": "tight | moderate | generous",
       "reasoning": "spacing strategy explanation",
       "specificGuidelines": ["spacing recommendations"]
-    }},
-    "visualHierarchy": {{
+    },
+    "visualHierarchy": {
       "recommended": "clear hierarchy strategy",
       "reasoning": "how to create visual hierarchy",
       "specificGuidelines": ["hierarchy recommendations"]
-    }}
-  }},
-  "storytellingStructure": {{
+    }
+  },
+  "storytellingStructure": {
     "narrativeApproach": "Problem-Solution | Journey | Comparison | Transformation | Data Story | Hero's Journey | Before-After-Bridge",
     "keyMessages": ["main message 1", "main message 2", "main message 3"],
     "emotionalTone": "confident | urgent | aspirational | calm | disruptive | authoritative | inspiring",
@@ -1280,86 +1952,52 @@ Provide a comprehensive design analysis with specific strategic direction, color
     "opening": "how to start the presentation",
     "closing": "how to end the presentation",
     "transitions": ["transition recommendations between sections"]
-  }},
-  "contentStrategy": {{
+  },
+  "contentStrategy": {
     "keyPoints": ["main content points to emphasize"],
     "dataPresentation": "how to present any data or statistics",
     "storyElements": ["storytelling elements to include"],
     "callToAction": "specific call to action recommendations",
     "supportingEvidence": "what evidence or proof points to include"
-  }},
-  "executionGuidance": {{
+  },
+  "executionGuidance": {
     "priorityFixes": ["top 3 priority improvements in order with specific details"],
     "quickWins": ["easy improvements with high impact"],
     "designPrinciples": ["key principles to follow for this presentation type"],
     "slideTemplateNeeds": ["what slide templates would help most"],
     "technicalSpecs": ["technical specifications and requirements"],
     "deliveryTips": ["presentation delivery recommendations"]
-  }},
-  "clientQuestions": {{
+  },
+  "clientQuestions": {
     "clarifyingQuestions": ["questions to ask client about context/ambitions"],
     "stakeholderQuestions": ["questions about audience and dynamics"],
     "visualReadinessQuestions": ["questions about design preferences and constraints"],
     "technicalQuestions": ["questions about technical requirements"],
     "timelineQuestions": ["questions about project timeline and milestones"]
-  }},
-  "designCompassStage": {{
+  },
+  "designCompassStage": {
     "currentStage": "Context | Ambitions | Decisions | Story | Sell",
     "nextSteps": ["what to do next in the design process"],
     "stageGuidance": "specific advice for moving to next stage",
     "deliverables": ["what deliverables are needed for this stage"]
-  }},
-  "brandIntegration": {{
+  },
+  "brandIntegration": {
     "brandAlignment": "how to align with brand guidelines",
     "brandElements": ["specific brand elements to include"],
     "brandColors": ["brand color recommendations"],
     "brandVoice": "tone and voice recommendations"
-  }},
-    "technicalSpecifications": {{
+  },
+    "technicalSpecifications": {
     "format": "PowerPoint | Keynote | PDF | Web",
     "aspectRatio": "16:9 | 4:3 | custom",
     "resolution": "recommended resolution",
     "fileSize": "target file size considerations",
     "compatibility": "compatibility requirements"
-  }}
-}}"""
-
-    def _create_slide_analysis_prompt(self, slide_data, presentation_context, audience_info, slide_number):
-        """Create the slide-specific analysis prompt"""
-        
-        # Build slide content sections
-        slide_text = slide_data.get('text_content', '')
-        slide_notes = slide_data.get('notes', '')
-        shapes_count = slide_data.get('shapes_count', 0)
-        text_boxes = slide_data.get('text_boxes', 0)
-        images = slide_data.get('images', 0)
-        charts = slide_data.get('charts', 0)
-        tables = slide_data.get('tables', 0)
-        layout_type = slide_data.get('layout_type', 'unknown')
-        colors = slide_data.get('colors', [])
-        fonts = slide_data.get('fonts', [])
-        
-        # Build context sections
-        audience_text = ""
-        if audience_info:
-            retainer_client = audience_info.get('retainer_client', '')
-            retainer_info = f"- Retainer Client: {retainer_client}" if retainer_client else ""
-            
-            audience_text = f"""AUDIENCE INFORMATION:
-- Type: {audience_info.get('type', 'Not specified')}
-- Goal: {audience_info.get('goal', 'Not specified')}
-- Size: {audience_info.get('size', 'Not specified')}
-- Additional Context: {audience_info.get('context', 'None provided')}
-{retainer_info}
-
-"""
-        
-        presentation_type = presentation_context.get('presentationType', {}).get('primary', 'Unknown')
-        strategic_goal = presentation_context.get('strategicDirection', {}).get('primaryStrategy', 'Not specified')
-        
-        return f"""Analyze this individual slide (Slide {slide_number}) with detailed, actionable recommendations:
+  }
+}"""
 
-SLIDE CONTENT:
+# Slide analysis prompt sections, shared by single-slide and batched prompts
+_SLIDE_CONTENT_TEMPLATE = """SLIDE CONTENT:
 Text Content: {slide_text}
 Speaker Notes: {slide_notes}
 Layout Type: {layout_type}
@@ -1368,18 +2006,18 @@ Text Boxes: {text_boxes}
 Images: {images}
 Charts: {charts}
 Tables: {tables}
-Colors Used: {', '.join(colors) if colors else 'None detected'}
-Fonts Used: {', '.join(fonts) if fonts else 'Default fonts'}
+Colors Used: {colors_used}
+Fonts Used: {fonts_used}
+"""
 
-PRESENTATION CONTEXT:
+_SLIDE_CONTEXT_TEMPLATE = """PRESENTATION CONTEXT:
 Presentation Type: {presentation_type}
 Strategic Goal: {strategic_goal}
 
 {audience_text}
+"""
 
-Provide detailed, slide-specific analysis and recommendations. Respond with this JSON structure:
-
-{{
+_SLIDE_SCHEMA_TEMPLATE = """{{
   "slideOverview": {{
     "slideNumber": {slide_number},
     "contentSummary": "brief summary of what this slide contains",
@@ -1462,9 +2100,505 @@ Provide detailed, slide-specific analysis and recommendations. Respond with this
   }}
 }}"""
 
+# Slide analysis prompt, rendered through _build_slide_prompt
+_SLIDE_PROMPT_TEMPLATE = (
+    "Analyze this individual slide (Slide {slide_number}) with detailed, actionable recommendations:\n\n"
+    + _SLIDE_CONTENT_TEMPLATE + "\n"
+    + _SLIDE_CONTEXT_TEMPLATE + "\n"
+    + "Provide detailed, slide-specific analysis and recommendations. Respond with this JSON structure:\n\n"
+    + _SLIDE_SCHEMA_TEMPLATE
+)
+
+# Batched slide analysis prompt; the schema is shown once with placeholders
+_SLIDE_BATCH_PROMPT_TEMPLATE = """Analyze each of the following {slide_count} slides individually with detailed, actionable recommendations.
+
+{slides}
+{context}
+Provide detailed, slide-specific analysis and recommendations for every slide. Respond with a JSON object of the form {{"slides": [...]}} holding exactly {slide_count} analyses in the order the slides are given, each with this JSON structure:
+
+{schema}"""
+
+_SLIDE_BATCH_SCHEMA = _SLIDE_SCHEMA_TEMPLATE.format_map({
+    'slide_number': '<slide number>',
+    'images': '<images>',
+    'charts': '<charts>',
+    'tables': '<tables>',
+    'layout_type': '<layout type>',
+    'colors': '<colors used>',
+    'fonts': '<fonts used>'
+})
+
+@lru_cache(maxsize=512)
+def _build_slide_prompt(slide_number, slide_text, slide_notes, layout_type,
+                        shapes_count, text_boxes, images, charts, tables,
+                        colors, fonts, presentation_type, strategic_goal, audience_text):
+    """Render the slide analysis prompt (memoized, re-analysing a slide reuses it)"""
+    return _SLIDE_PROMPT_TEMPLATE.format_map({
+        'slide_number': slide_number,
+        'slide_text': slide_text,
+        'slide_notes': slide_notes,
+        'layout_type': layout_type,
+        'shapes_count': shapes_count,
+        'text_boxes': text_boxes,
+        'images': images,
+        'charts': charts,
+        'tables': tables,
+        'colors': list(colors),
+        'fonts': list(fonts),
+        'colors_used': ', '.join(colors) if colors else 'None detected',
+        'fonts_used': ', '.join(fonts) if fonts else 'Default fonts',
+        'presentation_type': presentation_type,
+        'strategic_goal': strategic_goal,
+        'audience_text': audience_text
+    })
+
+class OpenAIService:
+    """OpenAI service for design analysis"""
+    
+    def __init__(self, api_key):
+        # The key is passed on every request rather than set on the shared openai
+        # module, so cached services for different keys never see each other's key
+        self.api_key = api_key
+        self.openai = get_openai()
+    
+    def analyze_design(self, content, company_context="", audience_info=None):
+        """Analyze design using the OpenAI analysis model"""
+        cache_key = ParseCache.hash_json(['design', ANALYSIS_MODEL, content, company_context, audience_info])
+        cached = analysis_cache.get(cache_key, max_age=ANALYSIS_CACHE_TTL)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = self._create_design_compass_prompt(content, company_context, audience_info)
+            
+            response = self.openai.ChatCompletion.create(
+                model=ANALYSIS_MODEL,
+                messages=[
+                    {"role": "system", "content": _DESIGN_SYSTEM_MSG},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=3000,
+                response_format=JSON_RESPONSE_FORMAT,
+                temperature=0.7,
+                api_key=self.api_key
+            )
+            
+            analysis_text = response.choices[0].message.content
+            
+            # Clean and parse JSON response
+            analysis = loads_json(strip_code_fence(analysis_text))
+            analysis_cache.set(cache_key, analysis)
+            return analysis
+            
+        except Exception as e:
+            logger.error(f"OpenAI analysis error: {str(e)}")
+            raise ValueError(f"Analysis failed: {str(e)}")
+    
+    MAX_CONCURRENT_SLIDE_CALLS = 16  # In-flight requests for bulk slide analysis
+    SLIDE_BATCH_SIZE = 8  # Slides analysed per request in bulk analysis
+    
+    def analyze_slide(self, slide_data, presentation_context, audience_info, slide_number):
+        """Analyze individual slide with detailed recommendations"""
+        cache_key = self._slide_cache_key(slide_data, presentation_context, audience_info, slide_number)
+        cached = analysis_cache.get(cache_key, max_age=ANALYSIS_CACHE_TTL)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = self._create_slide_analysis_prompt(slide_data, presentation_context, audience_info, slide_number)
+            
+            response = self.openai.ChatCompletion.create(
+                model=ANALYSIS_MODEL,
+                messages=self._slide_analysis_messages(prompt),
+                max_tokens=2000,
+                response_format=JSON_RESPONSE_FORMAT,
+                temperature=0.7,
+                api_key=self.api_key
+            )
+            
+            analysis = self._parse_slide_analysis(response.choices[0].message.content, slide_data, slide_number)
+            self._cache_slide_analysis(cache_key, analysis)
+            return analysis
+            
+        except Exception as e:
+            logger.error(f"OpenAI slide analysis error: {str(e)}")
+            raise ValueError(f"Slide analysis failed: {str(e)}")
+    
+    def stream_slide_analysis(self, slide_data, presentation_context, audience_info, slide_number):
+        """Yield the slide analysis text as the model produces it"""
+        prompt = self._create_slide_analysis_prompt(slide_data, presentation_context, audience_info, slide_number)
+        
+        response = self.openai.ChatCompletion.create(
+            model=ANALYSIS_MODEL,
+            messages=self._slide_analysis_messages(prompt),
+            max_tokens=2000,
+            response_format=JSON_RESPONSE_FORMAT,
+            temperature=0.7,
+            stream=True,
+            api_key=self.api_key
+        )
+        
+        for chunk in response:
+            delta = chunk.choices[0].delta.get('content')
+            if delta:
+                yield delta
+    
+    async def analyze_slide_async(self, slide_data, presentation_context, audience_info, slide_number):
+        """Async variant of analyze_slide so many slides can be in flight at once"""
+        cache_key = self._slide_cache_key(slide_data, presentation_context, audience_info, slide_number)
+        cached = analysis_cache.get(cache_key, max_age=ANALYSIS_CACHE_TTL)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = self._create_slide_analysis_prompt(slide_data, presentation_context, audience_info, slide_number)
+            
+            response = await self.openai.ChatCompletion.acreate(
+                model=ANALYSIS_MODEL,
+                messages=self._slide_analysis_messages(prompt),
+                max_tokens=2000,
+                response_format=JSON_RESPONSE_FORMAT,
+                temperature=0.7,
+                api_key=self.api_key
+            )
+            
+            analysis = self._parse_slide_analysis(response.choices[0].message.content, slide_data, slide_number)
+            self._cache_slide_analysis(cache_key, analysis)
+            return analysis
+            
+        except Exception as e:
+            logger.error(f"OpenAI slide analysis error: {str(e)}")
+            raise ValueError(f"Slide analysis failed: {str(e)}")
+    
+    async def analyze_slides_batch(self, numbered_slides, presentation_context, audience_info):
+        """Analyze several (slide_number, slide_data) pairs in a single request.
+        
+        Returns one analysis per slide in input order; raises ValueError if the
+        reply is not a JSON object with a matching "slides" array.
+        """
+        try:
+            prompt = self._create_slide_batch_prompt(numbered_slides, presentation_context, audience_info)
+            
+            response = await self.openai.ChatCompletion.acreate(
+                model=ANALYSIS_MODEL,
+                messages=self._slide_analysis_messages(prompt),
+                max_tokens=2000 * len(numbered_slides),
+                response_format=JSON_RESPONSE_FORMAT,
+                temperature=0.7,
+                api_key=self.api_key
+            )
+            
+            analyses = loads_json(strip_code_fence(response.choices[0].message.content))['slides']
+            if len(analyses) != len(numbered_slides):
+                raise ValueError(f"expected {len(numbered_slides)} analyses, got {len(analyses)}")
+            
+        except Exception as e:
+            logger.error(f"OpenAI batch slide analysis error: {str(e)}")
+            raise ValueError(f"Batch slide analysis failed: {str(e)}")
+        
+        for (slide_number, slide_data), analysis in zip(numbered_slides, analyses):
+            self._cache_slide_analysis(
+                self._slide_cache_key(slide_data, presentation_context, audience_info, slide_number), analysis
+            )
+        return analyses
+    
+    async def analyze_slides_bulk(self, slides_data, presentation_context, audience_info):
+        """Analyze many slides concurrently, SLIDE_BATCH_SIZE slides per request.
+        
+        Cached slides are served without a request, and at most
+        MAX_CONCURRENT_SLIDE_CALLS requests are in flight. Results keep the
+        input order; a batch whose reply cannot be used is retried slide by
+        slide, and a slide that still fails gets an error entry instead of
+        failing the whole run.
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_SLIDE_CALLS)
+        results = [None] * len(slides_data)
+        pending = []
+        
+        for index, slide_data in enumerate(slides_data):
+            slide_number = slide_data.get('slide_number', index + 1)
+            cached = analysis_cache.get(
+                self._slide_cache_key(slide_data, presentation_context, audience_info, slide_number),
+                max_age=ANALYSIS_CACHE_TTL
+            )
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, slide_number, slide_data))
+        
+        async def analyze_one(index, slide_number, slide_data):
+            async with semaphore:
+                try:
+                    results[index] = await self.analyze_slide_async(slide_data, presentation_context, audience_info, slide_number)
+                except ValueError as e:
+                    results[index] = {'slide_number': slide_number, 'error': str(e)}
+        
+        async def analyze_batch(batch):
+            if len(batch) == 1:
+                return await analyze_one(*batch[0])
+            
+            async with semaphore:
+                try:
+                    analyses = await self.analyze_slides_batch(
+                        [(slide_number, slide_data) for _, slide_number, slide_data in batch],
+                        presentation_context, audience_info
+                    )
+                except ValueError:
+                    analyses = None
+            
+            if analyses is None:
+                await asyncio.gather(*[analyze_one(*item) for item in batch])
+                return
+            for (index, _, _), analysis in zip(batch, analyses):
+                results[index] = analysis
+        
+        import aiohttp  # Imported on first use, only bulk slide analysis needs it
+        
+        # One keep-alive HTTP session for the whole run instead of one per request
+        async with aiohttp.ClientSession() as session:
+            self.openai.aiosession.set(session)
+            await asyncio.gather(*[
+                analyze_batch(pending[start:start + self.SLIDE_BATCH_SIZE])
+                for start in range(0, len(pending), self.SLIDE_BATCH_SIZE)
+            ])
+        return results
+    
+    def analyze_slides(self, slides_data, presentation_context, audience_info):
+        """Blocking entry point for Flask routes: run the bulk analysis on a fresh event loop"""
+        return asyncio.run(self.analyze_slides_bulk(slides_data, presentation_context, audience_info))
+    
+    def _slide_cache_key(self, slide_data, presentation_context, audience_info, slide_number):
+        """Content hash of a slide analysis request (the API key is not part of it)"""
+        return ParseCache.hash_json([ANALYSIS_MODEL, slide_number, slide_data, presentation_context, audience_info])
+    
+    def _cache_slide_analysis(self, cache_key, analysis):
+        """Store a slide analysis unless it is the placeholder returned for unparseable output"""
+        if 'error' not in analysis:
+            analysis_cache.set(cache_key, analysis)
+    
+    def _slide_analysis_messages(self, prompt):
+        """Build the chat messages for a slide analysis request"""
+        return [
+            {"role": "system", "content": _SLIDE_SYSTEM_MSG},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _parse_slide_analysis(self, analysis_text, slide_data, slide_number):
+        """Parse the model's slide analysis, falling back to a placeholder structure on bad JSON"""
+        try:
+            # Remove markdown code blocks if present, then parse the JSON
+            return loads_json(strip_code_fence(analysis_text))
+            
+        except json.JSONDecodeError as json_error:
+            logger.error(f"JSON parsing error: {json_error}")
+            logger.error(f"Raw response: {analysis_text}")
+            
+            # Return a fallback analysis structure
+            return {
+                "slideOverview": {
+                    "slideNumber": slide_number,
+                    "contentSummary": "Analysis failed - please try again",
+                    "slidePurpose": "Unable to determine",
+                    "effectiveness": "unknown",
+                    "priority": "unknown"
+                },
+                "contentAnalysis": {
+                    "textContent": {
+                        "clarity": "Unable to analyze",
+                        "organization": "Unable to analyze",
+                        "length": "unknown",
+                        "keyMessages": ["Analysis failed"],
+                        "improvements": ["Please try analyzing this slide again"]
+                    },
+                    "visualElements": {
+                        "images": {
+                            "count": slide_data.get('images', 0),
+                            "relevance": "Unable to analyze",
+                            "quality": "unknown",
+                            "recommendations": ["Please try again"]
+                        },
+                        "charts": {
+                            "count": slide_data.get('charts', 0),
+                            "effectiveness": "Unable to analyze",
+                            "clarity": "Unable to analyze",
+                            "improvements": ["Please try again"]
+                        },
+                        "tables": {
+                            "count": slide_data.get('tables', 0),
+                            "readability": "Unable to analyze",
+                            "structure": "Unable to analyze",
+                            "improvements": ["Please try again"]
+                        }
+                    }
+                },
+                "designRecommendations": {
+                    "layout": {
+                        "currentLayout": slide_data.get('layout_type', 'unknown'),
+                        "effectiveness": "Unable to analyze",
+                        "recommendedLayout": "Unable to determine",
+                        "specificChanges": ["Please try analyzing this slide again"],
+                        "visualHierarchy": "Unable to analyze"
+                    },
+                    "colorScheme": {
+                        "currentColors": slide_data.get('colors', []),
+                        "recommendations": ["Unable to analyze"],
+                        "contrast": "Unable to analyze",
+                        "accessibility": "Unable to analyze"
+                    },
+                    "typography": {
+                        "currentFonts": slide_data.get('fonts', []),
+                        "readability": "Unable to analyze",
+                        "recommendations": ["Unable to analyze"],
+                        "hierarchy": "Unable to analyze"
+                    }
+                },
+                "actionItems": {
+                    "immediate": ["Try analyzing this slide again"],
+                    "shortTerm": ["Contact support if issue persists"],
+                    "longTerm": ["Consider manual review"]
+                },
+                "error": "JSON parsing failed - please try again"
+            }
+    
+    def _create_design_compass_prompt(self, content, company_context, audience_info=None):
+        """Create the design compass analysis prompt"""
+        
+        # Build content sections
+        slide_count_text = ""
+        if content.get('slide_count'):
+            slide_count_text = f"Slide Count: {content['slide_count']}"
+        
+        colors_text = ""
+        if content.get('metadata', {}).get('colors'):
+            colors_text = f"Current Colors: {', '.join(content['metadata']['colors'])}"
+        
+        fonts_text = ""
+        if content.get('metadata', {}).get('fonts'):
+            fonts_text = f"Fonts: {', '.join(content['metadata']['fonts'])}"
+        
+        images_text = ""
+        if content.get('metadata', {}).get('has_images'):
+            images_text = f"Has Images: {content['metadata']['has_images']}"
+        
+        bullets_text = ""
+        if content.get('metadata', {}).get('bullet_point_count'):
+            bullets_text = f"Bullet Points: {content['metadata']['bullet_point_count']}"
+        
+        company_text = ""
+        if company_context:
+            company_text = f"COMPANY DESIGN GUIDELINES:\n{company_context}\n"
+        
+        audience_text = self._audience_section(audience_info)
+        
+        return _DESIGN_PROMPT_HEADER.format_map({
+            'slide_count_text': slide_count_text,
+            'text_content': content.get('text_content', ''),
+            'colors_text': colors_text,
+            'fonts_text': fonts_text,
+            'images_text': images_text,
+            'bullets_text': bullets_text,
+            'company_text': company_text,
+            'audience_text': audience_text
+        }) + _DESIGN_SCHEMA
+
+    def _audience_section(self, audience_info):
+        """Audience block shared by the analysis prompts (empty without audience info)"""
+        if not audience_info:
+            return ""
+        
+        retainer_client = audience_info.get('retainer_client', '')
+        retainer_info = f"- Retainer Client: {retainer_client}" if retainer_client else ""
+        
+        return f"""AUDIENCE INFORMATION:
+- Type: {audience_info.get('type', 'Not specified')}
+- Goal: {audience_info.get('goal', 'Not specified')}
+- Size: {audience_info.get('size', 'Not specified')}
+- Additional Context: {audience_info.get('context', 'None provided')}
+{retainer_info}
+
+"""
+    
+    def _create_slide_analysis_prompt(self, slide_data, presentation_context, audience_info, slide_number):
+        """Create the slide-specific analysis prompt"""
+        
+        # Build slide content sections
+        slide_text = slide_data.get('text_content', '')
+        slide_notes = slide_data.get('notes', '')
+        shapes_count = slide_data.get('shapes_count', 0)
+        text_boxes = slide_data.get('text_boxes', 0)
+        images = slide_data.get('images', 0)
+        charts = slide_data.get('charts', 0)
+        tables = slide_data.get('tables', 0)
+        layout_type = slide_data.get('layout_type', 'unknown')
+        colors = slide_data.get('colors', [])
+        fonts = slide_data.get('fonts', [])
+        
+        # Build context sections
+        audience_text = self._audience_section(audience_info)
+        
+        presentation_type = presentation_context.get('presentationType', {}).get('primary', 'Unknown')
+        strategic_goal = presentation_context.get('strategicDirection', {}).get('primaryStrategy', 'Not specified')
+        
+        return _build_slide_prompt(
+            slide_number, slide_text, slide_notes, layout_type,
+            shapes_count, text_boxes, images, charts, tables,
+            tuple(colors), tuple(fonts),
+            presentation_type, strategic_goal, audience_text
+        )
+    
+    def _create_slide_batch_prompt(self, numbered_slides, presentation_context, audience_info):
+        """Create one prompt analysing several (slide_number, slide_data) pairs"""
+        sections = []
+        for slide_number, slide_data in numbered_slides:
+            colors = slide_data.get('colors', [])
+            fonts = slide_data.get('fonts', [])
+            sections.append(f"--- SLIDE {slide_number} ---\n" + _SLIDE_CONTENT_TEMPLATE.format_map({
+                'slide_text': slide_data.get('text_content', ''),
+                'slide_notes': slide_data.get('notes', ''),
+                'layout_type': slide_data.get('layout_type', 'unknown'),
+                'shapes_count': slide_data.get('shapes_count', 0),
+                'text_boxes': slide_data.get('text_boxes', 0),
+                'images': slide_data.get('images', 0),
+                'charts': slide_data.get('charts', 0),
+                'tables': slide_data.get('tables', 0),
+                'colors_used': ', '.join(colors) if colors else 'None detected',
+                'fonts_used': ', '.join(fonts) if fonts else 'Default fonts'
+            }))
+        
+        context = _SLIDE_CONTEXT_TEMPLATE.format_map({
+            'presentation_type': presentation_context.get('presentationType', {}).get('primary', 'Unknown'),
+            'strategic_goal': presentation_context.get('strategicDirection', {}).get('primaryStrategy', 'Not specified'),
+            'audience_text': self._audience_section(audience_info)
+        })
+        
+        return _SLIDE_BATCH_PROMPT_TEMPLATE.format_map({
+            'slide_count': len(numbered_slides),
+            'slides': '\n'.join(sections),
+            'context': context,
+            'schema': _SLIDE_BATCH_SCHEMA
+        })
+
 # Initialize services
 file_parser = FileParser()
 
+# OpenAI services reused per API key, keyed by a hash so raw keys are not used as dict keys
+OPENAI_SERVICE_CACHE_SIZE = 32
+_openai_services = OrderedDict()
+_openai_services_lock = threading.Lock()
+
+def get_openai_service(api_key: str) -> 'OpenAIService':
+    """Return the OpenAIService for api_key, reusing recent instances (LRU)"""
+    key_hash = hashlib.blake2b(api_key.encode(), digest_size=16).hexdigest()
+    with _openai_services_lock:
+        service = _openai_services.get(key_hash)
+        if service is None:
+            service = _openai_services[key_hash] = OpenAIService(api_key)
+            if len(_openai_services) > OPENAI_SERVICE_CACHE_SIZE:
+                _openai_services.popitem(last=False)
+        else:
+            _openai_services.move_to_end(key_hash)
+        return service
+
 @app.route('/')
 def index():
     """Main application page - serve React app"""
@@ -1479,10 +2613,95 @@ def health_check():
         'services': {
             'openai': 'available',
             'file_parser': 'available',
-            'memory_usage': MemoryManager.check_memory_usage()
+            'memory_usage': MemoryManager.cached_memory_usage(),
+            'peak_memory_percent': MemoryManager.peak_memory_percent()
         }
     })
 
+def save_stream_to_disk(stream, filename: str):
+    """Copy a raw upload stream into a temp file in the upload folder, chunk by chunk.
+    
+    Returns the temp file path, the content hash computed along the way and
+    the first 8 bytes for the magic-byte check.
+    """
+    suffix = '.' + filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+    hasher = ParseCache.new_hasher()
+    file_header = b''
+    with tempfile.NamedTemporaryFile(dir=app.config['UPLOAD_FOLDER'], suffix=suffix, delete=False) as tmp_file:
+        try:
+            for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b''):
+                if len(file_header) < 8:
+                    file_header += chunk[:8 - len(file_header)]
+                hasher.update(chunk)
+                tmp_file.write(chunk)
+        except BaseException:
+            # Upload cut short (too large, client gone): the caller never gets the path to clean up
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+            raise
+    return tmp_file.name, hasher.hexdigest(), file_header
+
+def json_stream(result: Dict[str, Any]):
+    """Serialize a parse result as JSON in pieces, one slide at a time.
+    
+    Avoids building the whole (possibly very large) response string at once.
+    """
+    yield '{'
+    separator = ''
+    for key, value in result.items():
+        yield separator + dumps_json(key) + ':'
+        separator = ','
+        if key == 'slides' and isinstance(value, list):
+            yield '['
+            for index, slide in enumerate(value):
+                yield (',' if index else '') + dumps_json(slide)
+            yield ']'
+        else:
+            yield dumps_json(value)
+    yield '}'
+
+def _parse_saved_file(file_path: str, validation_result: Dict[str, Any], content_hash: str):
+    """Parse an uploaded file already on disk and build the JSON response"""
+    # Log warnings if any
+    if validation_result['warnings']:
+        for warning in validation_result['warnings']:
+            logger.warning(f"File warning: {warning['message']}")
+    
+    # Check file size for logging
+    file_size = validation_result['file_info']['size']
+    if file_size > 100 * 1024 * 1024: # > 100MB
+        logger.info(f"Large file detected: {file_size / (1024*1024):.2f} MB")
+    
+    file_extension = validation_result['file_info']['extension']
+    
+    # Use memory management decorator
+    @MemoryManager.process_with_memory_management
+    def process_file():
+        if file_extension in ['ppt', 'pptx']:
+            parser = EnhancedFileParser(chunk_size=10)
+            return parser.parse_powerpoint_chunked(file_path)
+        else:
+            return file_parser.parse_file(file_path, file_extension)
+    
+    # Identical uploads reuse the earlier parse by the same parser backend and version;
+    # Word and text files have a single backend, which the extension already names
+    if file_extension in ['ppt', 'pptx']:
+        parser_backend = 'xml' if USE_XML_PARSER else 'python-pptx'
+    elif file_extension == 'pdf':
+        parser_backend = PDF_PARSE_METHOD
+    else:
+        parser_backend = None
+    cache_key = ParseCache.hash_json([PARSE_CACHE_VERSION, parser_backend, file_extension, content_hash])
+    result = parse_cache.get(cache_key)
+    if result is None:
+        result = process_file()
+        parse_cache.set(cache_key, result)
+    else:
+        logger.info(f"Parse cache hit for {content_hash}")
+    
+    logger.info(f"Parse result - slide_count: {result.get('slide_count')}, text_length: {len(result.get('text_content', ''))}")
+    return Response(json_stream(result), mimetype='application/json')
+
 @app.route('/parse-pptx', methods=['POST'])
 def parse_pptx():
     """Enhanced PowerPoint parsing endpoint with comprehensive error handling"""
@@ -1501,59 +2720,21 @@ def parse_pptx():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Validate file before processing
-        validation_result = FileValidator.validate_file(file)
-        if not validation_result['valid']:
-            return jsonify({
-                'error': 'File validation failed',
-                'details': validation_result['errors'],
-                'warnings': validation_result['warnings']
-            }), 400
-        
-        # Log warnings if any
-        if validation_result['warnings']:
-            for warning in validation_result['warnings']:
-                logger.warning(f"File warning: {warning['message']}")
-        
-        # Save file temporarily
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        
-        # Check file size for logging
-        file_size = validation_result['file_info']['size']
-        if file_size > 100 * 1024 * 1024: # > 100MB
-            logger.info(f"Large file detected: {file_size / (1024*1024):.2f} MB")
+        # The upload was spooled straight to a named file in the upload folder
+        file.stream.close()
+        file_path = file.stream.name
         
         try:
-            # Use memory management decorator
-            @MemoryManager.process_with_memory_management
-            def process_file():
-                file_extension = validation_result['file_info']['extension']
-                if file_extension in ['ppt', 'pptx']:
-                    parser = EnhancedFileParser(chunk_size=10)
-                    return parser.parse_powerpoint_chunked(file_path)
-                else:
-                    return file_parser.parse_file(file_path, file_extension)
-            
-            result = process_file()
-            
-            response_size = len(json.dumps(result))
-            if response_size > 10 * 1024 * 1024: # > 10MB response
-                logger.warning(f"Large response detected: {response_size / (1024*1024):.2f} MB")
-                summary = {
-                    'slide_count': result['slide_count'],
-                    'text_content': result['text_content'][:5000] + '...' if len(result['text_content']) > 5000 else result['text_content'],
-                    'metadata': result['metadata'],
-                    'slides_available': True,
-                    'total_slides': len(result.get('slides', [])),
-                    'response_truncated': True,
-                    'original_size_mb': response_size / (1024*1024)
-                }
-                return jsonify(summary)
+            # Validate file before processing
+            validation_result = FileValidator.validate_file(file_path, file.filename)
+            if not validation_result['valid']:
+                return jsonify({
+                    'error': 'File validation failed',
+                    'details': validation_result['errors'],
+                    'warnings': validation_result['warnings']
+                }), 400
             
-            logger.info(f"Parse result - slide_count: {result.get('slide_count')}, text_length: {len(result.get('text_content', ''))}")
-            return jsonify(result)
+            return _parse_saved_file(file_path, validation_result, ParseCache.hash_file(file_path))
         finally:
             if os.path.exists(file_path):
                 os.remove(file_path)
@@ -1569,6 +2750,57 @@ def parse_pptx():
         logger.error(f"Unexpected error in parse_pptx: {str(e)}")
         return jsonify({'error': 'An unexpected error occurred while processing the file'}), 500
 
+@app.route('/parse-pptx', methods=['PUT'])
+@app.route('/parse-pptx/stream', methods=['POST'])
+def parse_pptx_stream():
+    """Parse a file sent as the raw request body, streamed straight to disk.
+    
+    Skips multipart form parsing entirely; the original filename is passed
+    in the X-Filename header. Unsupported extensions are rejected before the
+    body is read.
+    """
+    try:
+        # Check rate limiting
+        if not rate_limiter.can_make_call():
+            return jsonify({
+                'error': 'Rate limit exceeded. Please wait before making another request.',
+                'type': 'RATE_LIMIT_EXCEEDED'
+            }), 429
+        
+        filename = secure_filename(request.headers.get('X-Filename', ''))
+        if not filename:
+            return jsonify({'error': 'No filename provided in X-Filename header'}), 400
+        if not allowed_file(filename):
+            return jsonify({'error': f'File type not supported. Supported types: {", ".join(ALLOWED_EXTENSIONS)}'}), 400
+        
+        file_path, content_hash, file_header = save_stream_to_disk(request.stream, filename)
+        
+        try:
+            # Validate the file on disk before processing
+            validation_result = FileValidator.validate_file(file_path, filename, file_header)
+            if not validation_result['valid']:
+                return jsonify({
+                    'error': 'File validation failed',
+                    'details': validation_result['errors'],
+                    'warnings': validation_result['warnings']
+                }), 400
+            
+            return _parse_saved_file(file_path, validation_result, content_hash)
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    except PresentationAnalyzerError as e:
+        logger.error(f"Presentation analyzer error: {e.message}")
+        return jsonify({
+            'error': e.message,
+            'type': e.error_type.value,
+            'details': e.details,
+            'suggestions': get_error_suggestions(e.error_type)
+        }), get_error_status_code(e.error_type)
+    except Exception as e:
+        logger.error(f"Unexpected error in parse_pptx_stream: {str(e)}")
+        return jsonify({'error': 'An unexpected error occurred while processing the file'}), 500
+
 @app.route('/analyze', methods=['POST'])
 def analyze_design():
     """Analyze design using OpenAI"""
@@ -1591,7 +2823,7 @@ def analyze_design():
             return jsonify({'error': 'Content required for analysis'}), 400
         
         # Initialize OpenAI service
-        openai_service = OpenAIService(api_key)
+        openai_service = get_openai_service(api_key)
         
         # Analyze design with audience information
         analysis = openai_service.analyze_design(content, company_context, audience_info)
@@ -1599,7 +2831,7 @@ def analyze_design():
         # Include slides data in the response for slide-by-slide analysis
         analysis['slides'] = slides_data
         
-        return jsonify(analysis)
+        return json_response(analysis)
         
     except Exception as e:
         logger.error(f"Error in analyze_design: {str(e)}")
@@ -1630,9 +2862,19 @@ def export_pdf():
         logger.error(f"Error in export_pdf: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def sse_event(value) -> str:
+    """Format a value as one server-sent event carrying a JSON payload"""
+    return f"data: {dumps_json(value)}\n\n"
+
 @app.route('/chat', methods=['POST'])
 def chat():
-    """Chat with the design assistant"""
+    """Chat with the design assistant.
+    
+    Returns {"response": text} as JSON. With ?stream=1 or an Accept:
+    text/event-stream header the reply is streamed as server-sent events
+    instead: {"delta": text} while the model is generating, then a final
+    {"response": full_text} event (or {"error": message} on failure).
+    """
     try:
         data = request.get_json()
         
@@ -1652,79 +2894,78 @@ def chat():
             return jsonify({'error': 'Message required'}), 400
         
         # Initialize OpenAI service
-        openai_service = OpenAIService(api_key)
+        openai_service = get_openai_service(api_key)
         
-        # Create enhanced chat prompt with better context management
-        system_prompt = """You are an expert presentation design consultant with deep knowledge of "The Presentation Design Compass" methodology. You help designers create compelling presentations that achieve their strategic goals.
-
-Your expertise includes:
-- Strategic presentation planning and audience analysis
-- Color theory and visual design principles
-- Typography and layout optimization
-- Storytelling and narrative structure
-- Brand integration and visual hierarchy
-- Technical specifications and delivery considerations
-
-Always provide specific, actionable advice based on the analysis context. Be encouraging but direct, and focus on practical improvements that will have the most impact."""
-
-        # Build context summary instead of dumping full JSON
-        context_summary = ""
+        # Per-request context follows the constant system prompt
+        context_parts = []
         if analysis:
-            context_summary = f"""PRESENTATION ANALYSIS SUMMARY:
-- Type: {analysis.get('presentationType', {}).get('primary', 'Unknown')}
-- Strategic Goal: {analysis.get('strategicDirection', {}).get('primaryStrategy', 'Not specified')}
-- Audience: {analysis.get('contextualGrounding', {}).get('audienceProfile', 'Not specified')}
-- Key Design Elements: {', '.join(analysis.get('designDirection', {}).get('colors', {}).get('primary', [])[:3]) if analysis.get('designDirection', {}).get('colors', {}).get('primary') else 'Not specified'}
-- Priority Issues: {', '.join(analysis.get('executionGuidance', {}).get('priorityFixes', [])[:2]) if analysis.get('executionGuidance', {}).get('priorityFixes') else 'Not specified'}
-"""
-
-        company_context_summary = ""
+            context_parts.append(_chat_analysis_summary(analysis))
         if context:
-            company_context_summary = f"COMPANY CONTEXT: {context}"
-
-        # Build conversation history for context
-        conversation_context = ""
-        if conversation_history:
-            recent_messages = conversation_history[-3:]  # Last 3 messages for context
-            conversation_context = f"RECENT CONVERSATION:\n" + "\n".join([
+            context_parts.append(f"COMPANY CONTEXT: {context}")
+        
+        # Prepare messages for OpenAI: constant system prompt first
+        messages = [{"role": "system", "content": _CHAT_SYSTEM_MSG}]
+        if context_parts:
+            messages.append({"role": "system", "content": "\n".join(context_parts)})
+        
+        # Add the most recent conversation history that fits the token budget
+        recent_history = trim_history_to_budget(conversation_history)
+        for msg in recent_history:
+            messages.append({
+                "role": msg.get('role', 'user'),
+                "content": msg.get('content', '')
+            })
+        
+        # Add current message, after a recap of the last 3 messages kept within the budget
+        user_prompt = _CHAT_QUESTION_TEMPLATE.format_map({'message': message})
+        if recent_history:
+            conversation_context = "RECENT CONVERSATION:\n" + "\n".join([
                 f"{'User' if msg.get('role') == 'user' else 'Assistant'}: {msg.get('content', '')}"
-                for msg in recent_messages
+                for msg in recent_history[-3:]
             ])
-
-        # Create the user prompt
-        user_prompt = f"""{context_summary}
-{company_context_summary}
-{conversation_context}
-
-USER QUESTION: {message}
-
-Please provide a helpful, specific response about their presentation design. Focus on practical advice and actionable insights. If they're asking about specific aspects of the analysis, reference the relevant data. If they need clarification on any design principles, explain them clearly."""
-        
-        # Prepare messages for OpenAI
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add conversation history (limit to last 10 messages to avoid token limits)
-        if conversation_history:
-            for msg in conversation_history[-10:]:
-                messages.append({
-                    "role": msg.get('role', 'user'),
-                    "content": msg.get('content', '')
-                })
-        
-        # Add current message
+            user_prompt = f"{conversation_context}\n\n{user_prompt}"
         messages.append({"role": "user", "content": user_prompt})
         
+        # An explicit ?stream= wins over the Accept header
+        if 'stream' in request.args:
+            stream = request.args['stream'] == '1'
+        else:
+            stream = request.accept_mimetypes.best == 'text/event-stream'
+        
         # Get response from OpenAI
-        response = openai.ChatCompletion.create(
+        response = openai_service.openai.ChatCompletion.create(
             model="gpt-4",
             messages=messages,
             max_tokens=1000,
-            temperature=0.7
+            temperature=0.7,
+            stream=stream,
+            api_key=openai_service.api_key
         )
         
-        chat_response = response.choices[0].message.content
+        if not stream:
+            chat_response = response.choices[0].message.content
+            return json_response({'response': chat_response})
         
-        return jsonify({'response': chat_response})
+        def generate():
+            parts = []
+            try:
+                for chunk in response:
+                    delta = chunk.choices[0].delta.get('content')
+                    if delta:
+                        parts.append(delta)
+                        yield sse_event({'delta': delta})
+                
+                yield sse_event({'response': ''.join(parts)})
+            except Exception as e:
+                logger.error(f"Error in chat stream: {str(e)}")
+                yield sse_event({'error': str(e)})
+        
+        # Disable proxy buffering so each delta reaches the client as it arrives
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
         
     except Exception as e:
         logger.error(f"Error in chat: {str(e)}")
@@ -1741,7 +2982,7 @@ def export_json():
             return jsonify({'error': 'Analysis data required'}), 400
         
         return send_file(
-            io.BytesIO(json.dumps(analysis, indent=2).encode()),
+            io.BytesIO(dumps_json_bytes(analysis, indent=True)),
             mimetype='application/json',
             as_attachment=True,
             download_name='design-analysis.json'
@@ -1773,17 +3014,92 @@ def analyze_slide():
             return jsonify({'error': 'Slide data required for analysis'}), 400
         
         # Initialize OpenAI service
-        openai_service = OpenAIService(api_key)
+        openai_service = get_openai_service(api_key)
         
         # Analyze individual slide
         slide_analysis = openai_service.analyze_slide(slide_data, presentation_context, audience_info, slide_number)
         
-        return jsonify(slide_analysis)
+        return json_response(slide_analysis)
         
     except Exception as e:
         logger.error(f"Error in analyze_slide: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/analyze-slide/stream', methods=['POST'])
+def analyze_slide_stream():
+    """Analyze an individual slide, streaming the model output as NDJSON.
+    
+    Each line is {"delta": text} while the model is generating, followed by
+    a final {"analysis": {...}} line (or {"error": message} on failure).
+    """
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    api_key = data.get('api_key')
+    if not api_key:
+        return jsonify({'error': 'OpenAI API key required'}), 400
+    
+    slide_data = data.get('slide_data')
+    presentation_context = data.get('presentation_context', {})
+    audience_info = data.get('audience_info', {})
+    slide_number = data.get('slide_number', 1)
+    
+    if not slide_data:
+        return jsonify({'error': 'Slide data required for analysis'}), 400
+    
+    openai_service = get_openai_service(api_key)
+    
+    def generate():
+        parts = []
+        try:
+            for delta in openai_service.stream_slide_analysis(slide_data, presentation_context, audience_info, slide_number):
+                parts.append(delta)
+                yield dumps_json({'delta': delta}) + '\n'
+            
+            analysis = openai_service._parse_slide_analysis(''.join(parts), slide_data, slide_number)
+            yield dumps_json({'analysis': analysis}) + '\n'
+        except Exception as e:
+            logger.error(f"Error in analyze_slide_stream: {str(e)}")
+            yield dumps_json({'error': str(e)}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/analyze-slides', methods=['POST'])
+def analyze_slides():
+    """Analyze a list of slides in one request.
+    
+    Slides are analyzed concurrently (see OpenAIService.analyze_slides_bulk),
+    so the whole deck takes about as long as its slowest batch rather than
+    one round trip per slide. Results come back in input order.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        api_key = data.get('api_key')
+        if not api_key:
+            return jsonify({'error': 'OpenAI API key required'}), 400
+        
+        slides_data = data.get('slides')
+        presentation_context = data.get('presentation_context', {})
+        audience_info = data.get('audience_info', {})
+        
+        if not slides_data or not isinstance(slides_data, list):
+            return jsonify({'error': 'A list of slides is required for analysis'}), 400
+        
+        openai_service = get_openai_service(api_key)
+        slide_analyses = openai_service.analyze_slides(slides_data, presentation_context, audience_info)
+        
+        return json_response({'slides': slide_analyses})
+        
+    except Exception as e:
+        logger.error(f"Error in analyze_slides: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/export/questions', methods=['POST'])
 def export_questions():
     """Export client questions"""
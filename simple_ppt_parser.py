@@ -1,12 +1,34 @@
+import atexit
+import hashlib
 import io
+import json
 import os
+import pathlib
+import queue
+import re
+import shutil
+import signal
+import socket
 import subprocess
+import tempfile
+import threading
+import time
 import uuid
-from flask import Flask, request, jsonify, send_from_directory
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from flask import Flask, request, jsonify, send_from_directory, make_response, abort
 from flask_cors import CORS
+from lxml import etree
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
 from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
+try:
+    import orjson
+except ImportError:  # Optional fast JSON encoder
+    orjson = None
 
 app = Flask(__name__)
 CORS(app)
@@ -19,6 +41,72 @@ app.config['MAX_CONTENT_LENGTH'] = max_mb * 1024 * 1024
 THUMBS_ROOT = os.path.abspath(os.getenv('PARSER_THUMBS_DIR', os.path.join(os.path.dirname(__file__), 'thumb_cache')))
 os.makedirs(THUMBS_ROOT, exist_ok=True)
 
+# Private working files (LibreOffice profiles, .ppt conversions). Kept outside
+# THUMBS_ROOT, which /thumbnails serves to anyone.
+WORK_ROOT = os.path.abspath(os.getenv('PARSER_WORK_ROOT', os.path.join(os.path.dirname(__file__), 'parser_work')))
+os.makedirs(WORK_ROOT, exist_ok=True)
+
+# Behind nginx, hand thumbnail downloads off with X-Accel-Redirect to an internal location
+# aliased to THUMBS_ROOT, e.g. location /_protected_thumbs/ { internal; alias /app/thumb_cache/; }
+XACCEL_THUMBS = os.getenv('PARSER_XACCEL', '0') == '1'
+XACCEL_THUMBS_PREFIX = os.getenv('PARSER_XACCEL_PREFIX', '/_protected_thumbs/')
+
+# Copy size when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Keep at most this many slide thumbnails per deck (0 = all)
+MAX_THUMBS = int(os.getenv('PARSER_MAX_THUMBS', '0'))
+
+# Serve only the first-slide preview embedded in the .pptx instead of rendering every slide
+EMBEDDED_THUMB_ONLY = os.getenv('PARSER_EMBEDDED_THUMB_ONLY', '0') == '1'
+EMBEDDED_THUMBNAIL_NAMES = ('docProps/thumbnail.jpeg', 'docProps/thumbnail.jpg', 'docProps/thumbnail.png')
+
+# One-off soffice renders run this much nicer than the web workers (POSIX only)
+RENDER_NICENESS = int(os.getenv('PARSER_RENDER_NICE', '10'))
+_NICE_PATH = shutil.which('nice') if os.name != 'nt' else None
+
+# Slides of one deck are parsed in parallel on these threads
+parse_executor = ThreadPoolExecutor(max_workers=int(os.getenv('PARSER_WORKERS', '4')))
+
+# Seconds a render may take before its soffice is killed
+RENDER_TIMEOUT = int(os.getenv('PARSER_RENDER_TIMEOUT', '180'))
+
+# Persistent LibreOffice listeners used for rendering (0 disables the pool)
+LO_WORKERS = int(os.getenv('PARSER_LO_WORKERS', '1'))
+
+# Thumbnail renders run here while the request thread parses the deck. LibreOffice
+# instances sharing a user profile cannot run concurrently, so by default there is
+# one render thread per pooled LibreOffice instance (each has its own profile).
+render_executor = ThreadPoolExecutor(max_workers=int(os.getenv('PARSER_RENDER_WORKERS', str(max(LO_WORKERS, 1)))))
+
+# Compiled XPaths over <a:txBody>: its paragraphs, and the text of each paragraph's runs
+# (the same nodes as text_frame.paragraphs / paragraph.runs, without python-pptx wrappers)
+_DRAWINGML_NS = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
+_PARAGRAPHS_XP = etree.XPath('a:p', namespaces=_DRAWINGML_NS)
+_RUN_TEXT_XP = etree.XPath('a:r/a:t/text()', namespaces=_DRAWINGML_NS)
+
+# Slide shape element tags (presentationml namespace) and the shape type checked per shape
+_PML_NS = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+_SP_TAG = f'{{{_PML_NS}}}sp'
+_GRP_SP_TAG = f'{{{_PML_NS}}}grpSp'
+_PIC_TAG = f'{{{_PML_NS}}}pic'
+_GRAPHIC_FRAME_TAG = f'{{{_PML_NS}}}graphicFrame'
+_PICTURE = MSO_SHAPE_TYPE.PICTURE
+
+# Alt texts reported per slide
+MAX_ALT_TEXTS = 10
+
+# Whitespace-separated words, as str.split() sees them
+_WORD_RE = re.compile(r'\S+')
+WORD_COUNT_CAP = 91
+
+
+def ojson(obj, status=200):
+    """JSON response, encoded with orjson in one C call when it is installed."""
+    if orjson is None:
+        return jsonify(obj), status
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
 
 def _get_alt_text(shape):
     try:
@@ -31,101 +119,131 @@ def _get_alt_text(shape):
     return ''
 
 
-def _analyze_shape(shape):
+def _analyze_slide_shapes(shapes):
+    """Count shape types and collect text lines for a slide's shapes.
+
+    Group members are walked depth-first in document order with an explicit
+    stack, adding straight into one counters dict and one text_lines list.
+    A group counts as a shape itself, plus each of its members.
+    """
     counters = {
         'images': 0,
         'charts': 0,
         'tables': 0,
         'text_boxes': 0,
-        'shapes_count': 1,
+        'shapes_count': 0,
         'alt_texts': []
     }
     text_lines = []
+    alt_texts = counters['alt_texts']
 
-    try:
-        stype = getattr(shape, 'shape_type', None)
-
-        if stype == MSO_SHAPE_TYPE.GROUP and hasattr(shape, 'shapes'):
-            for child in shape.shapes:
-                c_counters, c_text = _analyze_shape(child)
-                for k in counters:
-                    if k == 'alt_texts':
-                        counters[k].extend(c_counters[k])
-                    else:
-                        counters[k] += c_counters[k]
-                text_lines.extend(c_text)
-            return counters, text_lines
-
-        if stype == MSO_SHAPE_TYPE.PICTURE or hasattr(shape, 'image'):
-            counters['images'] += 1
-            alt_text = _get_alt_text(shape)
-            if alt_text:
-                counters['alt_texts'].append(alt_text)
-
-        if hasattr(shape, 'has_chart') and shape.has_chart:
-            counters['charts'] += 1
-
-        if hasattr(shape, 'has_table') and shape.has_table:
-            counters['tables'] += 1
-
-        if hasattr(shape, 'has_text_frame') and shape.has_text_frame:
-            counters['text_boxes'] += 1
-            for paragraph in shape.text_frame.paragraphs:
-                line = "".join(run.text for run in paragraph.runs).strip()
-                if line:
-                    text_lines.append(line)
-    except Exception:
-        pass
+    stack = list(shapes)
+    stack.reverse()
+    while stack:
+        shape = stack.pop()
+        counters['shapes_count'] += 1
+
+        try:
+            # Dispatch on the element tag: only the shape kinds that can have a
+            # property are asked for it, and each property is read once
+            tag = shape._element.tag
+
+            if tag == _GRP_SP_TAG:
+                children = list(shape.shapes)
+                children.reverse()
+                stack.extend(children)
+                continue
+
+            if tag == _SP_TAG:
+                # Autoshapes always have a text frame; a missing txBody just holds no text
+                counters['text_boxes'] += 1
+                tx_body = shape._element.txBody
+                if tx_body is not None:
+                    for paragraph in _PARAGRAPHS_XP(tx_body):
+                        line = "".join(_RUN_TEXT_XP(paragraph)).strip()
+                        if line:
+                            text_lines.append(line)
+            elif tag == _PIC_TAG:
+                # Picture placeholders and media report other shape types; count them if they carry an image
+                if shape.shape_type == _PICTURE or hasattr(shape, 'image'):
+                    counters['images'] += 1
+                    # Only MAX_ALT_TEXTS are reported; skip the lookup once they are collected
+                    if len(alt_texts) < MAX_ALT_TEXTS:
+                        alt_text = _get_alt_text(shape)
+                        if alt_text:
+                            alt_texts.append(alt_text)
+            elif tag == _GRAPHIC_FRAME_TAG:
+                if shape.has_chart:
+                    counters['charts'] += 1
+                if shape.has_table:
+                    counters['tables'] += 1
+        except Exception:
+            pass
 
     return counters, text_lines
 
 
+def _notes_text(slide):
+    # has_notes_slide first: reading slide.notes_slide creates an empty notes part when absent
+    if not slide.has_notes_slide:
+        return ""
+    notes_text_frame = slide.notes_slide.notes_text_frame
+    return getattr(notes_text_frame, 'text', '').strip() if notes_text_frame else ""
+
+
+def _layout_name(layout, layout_names):
+    # Keyed by the layout's root element (layouts themselves are unhashable); a dict
+    # setdefault is atomic, so the worker threads can share one cache per deck
+    name = layout_names.get(layout._element)
+    if name is None:
+        name = layout_names.setdefault(layout._element, getattr(layout, 'name', 'unknown') or 'unknown')
+    return name
+
+
+def _process_slide(numbered_slide, layout_names):
+    """Build one slide's dict; returns it with the slide's text lines."""
+    idx, slide = numbered_slide
+    total_counters, text_lines = _analyze_slide_shapes(slide.shapes)
+
+    slide_text = "\n".join(text_lines)
+
+    text_chars = len(slide_text)
+    visual_score = (total_counters['images'] * 3) + (total_counters['charts'] * 4) + (total_counters['tables'] * 2)
+    density = 'visual-heavy' if visual_score >= 6 and text_chars < 800 else 'balanced' if visual_score >= 3 else 'text-heavy'
+
+    return {
+        "slide_number": idx,
+        "text_content": slide_text,
+        "layout_type": _layout_name(slide.slide_layout, layout_names),
+        "images": total_counters['images'],
+        "charts": total_counters['charts'],
+        "tables": total_counters['tables'],
+        "text_boxes": total_counters['text_boxes'],
+        "shapes_count": total_counters['shapes_count'],
+        "alt_texts": total_counters['alt_texts'],
+        "notes": _notes_text(slide),
+        "visual_density": density
+    }, text_lines
+
+
 def extract_pptx_data(file_stream):
     prs = Presentation(file_stream)
 
+    # Resolve the slide parts up front, then build the independent slides across
+    # the worker threads; map() keeps them in deck order
+    slides = list(enumerate(prs.slides, start=1))
+
     slides_data = []
     all_text_lines = []
-
-    for idx, slide in enumerate(prs.slides, start=1):
-        total_counters = {
-            'images': 0,
-            'charts': 0,
-            'tables': 0,
-            'text_boxes': 0,
-            'shapes_count': 0,
-            'alt_texts': []
-        }
-        text_lines = []
-
-        for shape in slide.shapes:
-            c_counters, c_text = _analyze_shape(shape)
-            for k in total_counters:
-                if k == 'alt_texts':
-                    total_counters[k].extend(c_counters[k])
-                else:
-                    total_counters[k] += c_counters[k]
-            text_lines.extend(c_text)
-
-        slide_text = "\n".join(text_lines)
+    totals = {'images': 0, 'charts': 0, 'tables': 0}
+    # Layout names resolved once per layout; most slides share a few layouts
+    layout_names = {}
+    for slide_data, text_lines in parse_executor.map(partial(_process_slide, layout_names=layout_names), slides):
+        slides_data.append(slide_data)
         all_text_lines.extend(text_lines)
-
-        text_chars = len(slide_text)
-        visual_score = (total_counters['images'] * 3) + (total_counters['charts'] * 4) + (total_counters['tables'] * 2)
-        density = 'visual-heavy' if visual_score >= 6 and text_chars < 800 else 'balanced' if visual_score >= 3 else 'text-heavy'
-
-        slides_data.append({
-            "slide_number": idx,
-            "text_content": slide_text,
-            "layout_type": getattr(slide.slide_layout, 'name', 'unknown') or 'unknown',
-            "images": total_counters['images'],
-            "charts": total_counters['charts'],
-            "tables": total_counters['tables'],
-            "text_boxes": total_counters['text_boxes'],
-            "shapes_count": total_counters['shapes_count'],
-            "alt_texts": total_counters['alt_texts'][:10],
-            "notes": getattr(slide.notes_slide.notes_text_frame, 'text', '').strip() if hasattr(slide, 'notes_slide') and slide.notes_slide and hasattr(slide.notes_slide, 'notes_text_frame') and slide.notes_slide.notes_text_frame else "",
-            "visual_density": density
-        })
+        totals['images'] += slide_data['images']
+        totals['charts'] += slide_data['charts']
+        totals['tables'] += slide_data['tables']
 
     text_content = "\n".join(all_text_lines)
 
@@ -136,14 +254,39 @@ def extract_pptx_data(file_stream):
         "metadata": {
             "parseMethod": "python-pptx",
             "visual_summary": {
-                "total_images": sum(s['images'] for s in slides_data),
-                "total_charts": sum(s['charts'] for s in slides_data),
-                "total_tables": sum(s['tables'] for s in slides_data)
+                "total_images": totals['images'],
+                "total_charts": totals['charts'],
+                "total_tables": totals['tables']
             }
         }
     }
 
 
+def _png_size():
+    """Thumbnail width/height overrides (PARSER_PNG_WIDTH/HEIGHT), default 1920x1080."""
+    try:
+        return int(os.getenv('PARSER_PNG_WIDTH', '1920')), int(os.getenv('PARSER_PNG_HEIGHT', '1080'))
+    except Exception:
+        return 1920, 1080
+
+
+def _list_pngs(directory):
+    # scandir entries carry the file type from the directory read itself, no stat per name.
+    # Keep the match case-insensitive: PowerPoint's Export can write .PNG.
+    with os.scandir(directory) as entries:
+        return sorted(e.name for e in entries if e.name[-4:].lower() == '.png' and e.is_file())
+
+
+def _rendered_pngs(job_dir):
+    """Rendered PNGs in slide order, deleting any beyond PARSER_MAX_THUMBS."""
+    pngs = _list_pngs(job_dir)
+    if MAX_THUMBS:
+        for fn in pngs[MAX_THUMBS:]:
+            os.remove(os.path.join(job_dir, fn))
+        del pngs[MAX_THUMBS:]
+    return pngs
+
+
 def _render_with_powerpoint_com(input_path: str, out_dir: str) -> bool:
     """Render thumbnails using Microsoft PowerPoint COM automation (Windows only)."""
     try:
@@ -158,115 +301,602 @@ def _render_with_powerpoint_com(input_path: str, out_dir: str) -> bool:
         except Exception:
             return False
 
-        # Width/height optional overrides
-        try:
-            width = int(os.getenv('PARSER_PNG_WIDTH', '1920'))
-            height = int(os.getenv('PARSER_PNG_HEIGHT', '1080'))
-        except Exception:
-            width, height = 1920, 1080
+        width, height = _png_size()
 
         ppt = Dispatch('PowerPoint.Application')
         ppt.Visible = 0
         try:
             pres = ppt.Presentations.Open(input_path, WithWindow=False, ReadOnly=True)
             try:
-                # Export each slide as PNG
-                pres.Export(out_dir, 'PNG', width, height)
+                if MAX_THUMBS and pres.Slides.Count > MAX_THUMBS:
+                    # Export slide by slide so rendering stops after the limit
+                    for i in range(1, MAX_THUMBS + 1):
+                        pres.Slides(i).Export(os.path.join(out_dir, f'Slide{i:04d}.PNG'), 'PNG', width, height)
+                else:
+                    # Export each slide as PNG
+                    pres.Export(out_dir, 'PNG', width, height)
             finally:
                 pres.Close()
         finally:
             ppt.Quit()
 
         # Ensure some PNGs exist
-        pngs = [fn for fn in os.listdir(out_dir) if fn.lower().endswith('.png')]
-        pngs.sort()
-        return len(pngs) > 0
+        return len(_list_pngs(out_dir)) > 0
+    except Exception:
+        return False
+
+
+class LibreOfficePool:
+    """Long-running headless soffice listeners that convert documents over UNO.
+
+    Each worker is one soffice process with its own user profile, listening on
+    its own port. A worker handles one conversion at a time and is restarted
+    after recycle_after conversions, or after any failure, to bound leaks.
+    Profiles live under a directory named after this process and ports are
+    picked free on every start, so pools in separate web workers never share
+    a soffice instance.
+    """
+
+    CONNECT_TIMEOUT = 30  # Seconds to wait for a fresh soffice to accept connections
+
+    def __init__(self, uno, soffice_path, workers, recycle_after):
+        self.uno = uno
+        self.soffice_path = soffice_path
+        self.recycle_after = recycle_after
+        self.pid = os.getpid()
+        self.profiles_root = os.path.join(WORK_ROOT, 'lo_profiles', str(self.pid))
+        # A reused pid may have left profiles behind
+        shutil.rmtree(self.profiles_root, ignore_errors=True)
+        self.idle = queue.Queue()
+        self.workers = [
+            {'index': i, 'port': None, 'process': None, 'desktop': None, 'conversions': 0} for i in range(workers)
+        ]
+        for worker in self.workers:
+            self.idle.put(worker)
+
+    @staticmethod
+    def _free_port():
+        with socket.socket() as sock:
+            sock.bind(('localhost', 0))
+            return sock.getsockname()[1]
+
+    def _start(self, worker):
+        worker['port'] = self._free_port()
+        profile_dir = os.path.join(self.profiles_root, str(worker['index']))
+        cmd = [
+            self.soffice_path, '--headless', '--invisible', '--nologo', '--norestore', '--nodefault',
+            f"--accept=socket,host=localhost,port={worker['port']};urp;",
+            f"-env:UserInstallation={self.uno.systemPathToFileUrl(profile_dir)}"
+        ]
+        worker['process'] = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        local_context = self.uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext('com.sun.star.bridge.UnoUrlResolver', local_context)
+        url = f"uno:socket,host=localhost,port={worker['port']};urp;StarOffice.ComponentContext"
+        deadline = time.monotonic() + self.CONNECT_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(url)
+                break
+            except Exception:
+                if time.monotonic() > deadline or worker['process'].poll() is not None:
+                    self._stop(worker)
+                    raise
+                time.sleep(0.2)
+        worker['desktop'] = context.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', context)
+        worker['conversions'] = 0
+
+    def _stop(self, worker):
+        process = worker['process']
+        worker['process'] = worker['desktop'] = None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+    def _property(self, name, value):
+        prop = self.uno.createUnoStruct('com.sun.star.beans.PropertyValue')
+        prop.Name = name
+        prop.Value = value
+        return prop
+
+    def convert_to_png(self, input_path, out_dir):
+        """Export input_path as <stem>.png into out_dir, like soffice --convert-to png.
+
+        A conversion running past RENDER_TIMEOUT kills the worker's soffice and
+        raises TimeoutError.
+        """
+        worker = self.idle.get()
+        timed_out = threading.Event()
+        watchdog = None
+        try:
+            if worker['process'] is None or worker['process'].poll() is not None:
+                self._start(worker)
+
+            def kill_hung_worker(process=worker['process']):
+                timed_out.set()
+                process.kill()
+
+            watchdog = threading.Timer(RENDER_TIMEOUT, kill_hung_worker)
+            watchdog.daemon = True
+            watchdog.start()
+            document = worker['desktop'].loadComponentFromURL(
+                self.uno.systemPathToFileUrl(input_path), '_blank', 0, (self._property('Hidden', True),)
+            )
+            try:
+                stem = os.path.splitext(os.path.basename(input_path))[0]
+                document.storeToURL(
+                    self.uno.systemPathToFileUrl(os.path.join(out_dir, stem + '.png')),
+                    (self._property('FilterName', 'impress_png_Export'),)
+                )
+            finally:
+                document.close(True)
+            watchdog.cancel()
+            if timed_out.is_set():
+                raise TimeoutError(f"LibreOffice render exceeded {RENDER_TIMEOUT}s")
+
+            worker['conversions'] += 1
+            if worker['conversions'] >= self.recycle_after:
+                self._stop(worker)
+        except Exception as e:
+            if watchdog is not None:
+                watchdog.cancel()
+            self._stop(worker)
+            if timed_out.is_set() and not isinstance(e, TimeoutError):
+                raise TimeoutError(f"LibreOffice render exceeded {RENDER_TIMEOUT}s") from e
+            raise
+        finally:
+            self.idle.put(worker)
+
+    def close(self):
+        if os.getpid() != self.pid:
+            return  # Inherited over fork; the soffice processes belong to the parent
+        for worker in self.workers:
+            self._stop(worker)
+        shutil.rmtree(self.profiles_root, ignore_errors=True)
+
+
+_lo_pool = None
+_lo_pool_lock = threading.Lock()
+
+
+def get_libreoffice_pool():
+    """This process's LibreOfficePool, or None if disabled or the UNO bindings are missing."""
+    global _lo_pool
+    if LO_WORKERS <= 0:
+        return None
+    with _lo_pool_lock:
+        # A pool inherited over fork belongs to the parent: start this process's own
+        if _lo_pool is None or (_lo_pool and _lo_pool.pid != os.getpid()):
+            # Lazy import: the UNO bindings only exist in LibreOffice's Python
+            try:
+                import uno
+            except ImportError:
+                _lo_pool = False
+                return None
+            _lo_pool = LibreOfficePool(
+                uno,
+                os.getenv('SOFFICE_PATH', 'soffice'),
+                LO_WORKERS,
+                int(os.getenv('PARSER_LO_RECYCLE', '50'))
+            )
+            atexit.register(_lo_pool.close)
+        return _lo_pool or None
+
+
+def _run_soffice(cmd):
+    """Run a one-off soffice at lowered priority; returns its exit code, or None on timeout.
+
+    soffice runs in its own session so a timeout kills the whole process group
+    (the launcher plus oosplash/soffice.bin), not just the launcher. Output is
+    discarded instead of being buffered in pipes.
+    """
+    posix = os.name != 'nt'
+    if posix and _NICE_PATH:
+        # nice execs soffice in place, so it stays the group leader that killpg targets
+        cmd = [_NICE_PATH, '-n', str(RENDER_NICENESS)] + cmd
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=posix)
+    try:
+        return proc.wait(timeout=RENDER_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        if posix:
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+        proc.wait()
+        return None
+
+
+def _save_upload_to_job_dir(file_stream, filename):
+    """Stream an upload into a new thumbnail job directory.
+
+    Returns the saved path and the SHA-256 of the content, hashed while copying.
+    """
+    job_dir = os.path.join(THUMBS_ROOT, str(uuid.uuid4()))
+    os.makedirs(job_dir, exist_ok=True)
+    input_path = os.path.join(job_dir, filename)
+    hasher = hashlib.sha256()
+    with open(input_path, 'wb') as f:
+        for chunk in iter(lambda: file_stream.read(UPLOAD_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+            f.write(chunk)
+    return input_path, hasher.hexdigest()
+
+
+def _convert_ppt_to_pptx(input_path, digest):
+    """Replace a legacy .ppt in its job directory with a .pptx conversion.
+
+    Conversions are cached under WORK_ROOT/ppt2pptx by content hash, so
+    LibreOffice decodes the binary format once per deck; python-pptx and the
+    renderers then read the .pptx. Returns the new path.
+    """
+    cache_dir = os.path.join(WORK_ROOT, 'ppt2pptx')
+    cached = os.path.join(cache_dir, f"{digest}.pptx")
+    if not os.path.isfile(cached):
+        os.makedirs(cache_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        with tempfile.TemporaryDirectory(prefix='convert_', dir=cache_dir) as out_dir, \
+                tempfile.TemporaryDirectory(prefix='lo_profile_') as profile_dir:
+            cmd = [
+                os.getenv('SOFFICE_PATH', 'soffice'), '--headless', '--convert-to', 'pptx', '--outdir', out_dir, input_path,
+                f"-env:UserInstallation={pathlib.Path(profile_dir).as_uri()}"
+            ]
+            converted = os.path.join(out_dir, f"{stem}.pptx")
+            if _run_soffice(cmd) != 0 or not os.path.isfile(converted):
+                raise ValueError("could not convert .ppt to .pptx")
+            os.replace(converted, cached)
+
+    pptx_path = os.path.splitext(input_path)[0] + '.pptx'
+    try:
+        os.link(cached, pptx_path)
+    except OSError:
+        shutil.copyfile(cached, pptx_path)
+    os.remove(input_path)
+    return pptx_path
+
+
+def _thumbnail_cache_id(digest, embedded=False):
+    """Thumbnail directory (relative to THUMBS_ROOT) for a deck's content hash and PNG size."""
+    if embedded:
+        return f"by_hash/{digest}/embedded"
+    width, height = _png_size()
+    limit = f"_first{MAX_THUMBS}" if MAX_THUMBS else ''
+    return f"by_hash/{digest}/{width}x{height}{limit}"
+
+
+def _cached_thumbnails(digest):
+    """(job_id, pngs) from an earlier render of the same deck, or None.
+
+    In embedded-thumbnail mode a full render of the deck serves as well.
+    """
+    for embedded in ((True, False) if EMBEDDED_THUMB_ONLY else (False,)):
+        cache_id = _thumbnail_cache_id(digest, embedded)
+        try:
+            pngs = _list_pngs(os.path.join(THUMBS_ROOT, cache_id))
+        except FileNotFoundError:
+            continue
+        if pngs:
+            return cache_id, pngs
+    return None
+
+
+def _store_thumbnails(job_id, digest, embedded=False):
+    """Move a finished render under its content hash so re-uploads skip rendering.
+
+    Returns the id to serve the thumbnails from; if another request cached the
+    same deck first, the job keeps serving its own directory.
+    """
+    cache_id = _thumbnail_cache_id(digest, embedded)
+    job_dir = os.path.join(THUMBS_ROOT, job_id)
+    # Only the PNGs are meant to be public: drop the uploaded deck before sharing the directory
+    for entry in os.scandir(job_dir):
+        if entry.is_file() and not entry.name.lower().endswith('.png'):
+            os.remove(entry.path)
+    cache_dir = os.path.join(THUMBS_ROOT, cache_id)
+    os.makedirs(os.path.dirname(cache_dir), exist_ok=True)
+    try:
+        os.rename(job_dir, cache_dir)
+    except OSError:
+        return job_id
+    return cache_id
+
+
+def _store_render(job_id, digest, render):
+    """Cache the thumbnails of a finished render future as (thumbs_id, pngs).
+
+    Returns (None, []) when the render failed or produced no PNGs, or when
+    storing them failed; the job directory is deleted in that case.
+    """
+    try:
+        thumbs_id, pngs, embedded = render.result()
+        if thumbs_id and pngs:
+            return _store_thumbnails(thumbs_id, digest, embedded), pngs
     except Exception:
+        pass
+    shutil.rmtree(os.path.join(THUMBS_ROOT, job_id), ignore_errors=True)
+    return None, []
+
+
+# Background render jobs for /parse-pptx?thumbnails=async, polled through
+# /thumbnails-status/<job_id>. State lives in marker files so that every worker
+# process can answer a poll: <job_id>.pending while rendering, then <job_id>.json
+# with the outcome. Outcomes are pruned RENDER_JOB_TTL seconds after they land.
+RENDER_JOBS_DIR = os.path.join(WORK_ROOT, 'render_jobs')
+os.makedirs(RENDER_JOBS_DIR, exist_ok=True)
+RENDER_JOB_TTL = int(os.getenv('PARSER_RENDER_JOB_TTL', '3600'))
+
+
+def _start_render_job(job_id):
+    open(os.path.join(RENDER_JOBS_DIR, f"{job_id}.pending"), 'wb').close()
+
+
+def _finish_render_job(job_id, digest, render):
+    """Done-callback of a background render: cache the output and publish it."""
+    outcome = {"status": "error", "thumbs_id": None, "pngs": []}
+    try:
+        thumbs_id, pngs = _store_render(job_id, digest, render)
+        if pngs:
+            outcome = {"status": "done", "thumbs_id": thumbs_id, "pngs": pngs}
+    finally:
+        # Written before the pending marker goes away, so a poll never finds neither
+        try:
+            result_path = os.path.join(RENDER_JOBS_DIR, f"{job_id}.json")
+            with open(result_path + '.tmp', 'w') as f:
+                json.dump(outcome, f)
+            os.replace(result_path + '.tmp', result_path)
+        finally:
+            try:
+                os.remove(os.path.join(RENDER_JOBS_DIR, f"{job_id}.pending"))
+            except FileNotFoundError:
+                pass
+        _prune_render_jobs()
+
+
+def _prune_render_jobs():
+    cutoff = time.time() - RENDER_JOB_TTL
+    for entry in os.scandir(RENDER_JOBS_DIR):
+        try:
+            if entry.name.endswith('.json') and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # Pruned concurrently by another worker
+
+
+def _render_job_state(job_id):
+    """Outcome dict of a background render, {"status": "pending"} or None if unknown."""
+    try:
+        if str(uuid.UUID(job_id)) != job_id:
+            return None  # Only the canonical form names a marker file
+    except ValueError:
+        return None
+    try:
+        with open(os.path.join(RENDER_JOBS_DIR, f"{job_id}.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        pass
+    if os.path.exists(os.path.join(RENDER_JOBS_DIR, f"{job_id}.pending")):
+        return {"status": "pending"}
+    return None
+
+
+def _thumbnail_urls(thumbs_id, pngs):
+    base = request.host_url.rstrip('/')
+    return [f"{base}/thumbnails/{thumbs_id}/{png}" for png in pngs]
+
+
+def _extract_embedded_thumbnail(input_path, out_dir) -> bool:
+    """Save the preview image a .pptx ships in docProps as slide_0001.png (first slide only)."""
+    try:
+        from PIL import Image
+    except Exception:
+        return False
+
+    try:
+        with zipfile.ZipFile(input_path) as package:
+            names = set(package.namelist())
+            name = next((n for n in EMBEDDED_THUMBNAIL_NAMES if n in names), None)
+            if name is None:
+                return False
+            data = package.read(name)
+        with Image.open(io.BytesIO(data)) as image:
+            image.save(os.path.join(out_dir, 'slide_0001.png'), 'PNG')
+        return True
+    except (zipfile.BadZipFile, KeyError, OSError):
+        # Legacy .ppt (not a zip), or a missing/unreadable preview image
         return False
 
 
-def _render_thumbnails_to_disk(file_bytes, original_filename):
-    """Generate PNG thumbnails via COM (if enabled) or LibreOffice."""
+def _render_thumbnails_to_disk(input_path):
+    """Generate PNG thumbnails via COM (if enabled) or LibreOffice next to input_path.
+
+    Returns (job_id, pngs, embedded), embedded telling whether the PNG is the
+    deck's own preview image rather than a render.
+    """
     try:
-        job_id = str(uuid.uuid4())
-        job_dir = os.path.join(THUMBS_ROOT, job_id)
-        os.makedirs(job_dir, exist_ok=True)
-        input_path = os.path.join(job_dir, secure_filename(original_filename))
-        with open(input_path, 'wb') as f:
-            f.write(file_bytes)
+        job_dir = os.path.dirname(input_path)
+        job_id = os.path.basename(job_dir)
+
+        # 0) Preview-only mode: the thumbnail embedded in the deck, no renderer at all
+        if EMBEDDED_THUMB_ONLY and _extract_embedded_thumbnail(input_path, job_dir):
+            return job_id, _list_pngs(job_dir), True
 
         # 1) Try high-fidelity PowerPoint COM rendering if enabled
         if _render_with_powerpoint_com(input_path, job_dir):
-            pngs = [fn for fn in os.listdir(job_dir) if fn.lower().endswith('.png')]
-            pngs.sort()
-            return job_id, pngs
+            return job_id, _rendered_pngs(job_dir), False
 
-        # 2) Fallback to LibreOffice
+        # 2) Persistent LibreOffice listener, skipping the soffice cold start
+        pool = get_libreoffice_pool()
+        if pool is not None:
+            try:
+                pool.convert_to_png(input_path, job_dir)
+                pngs = _rendered_pngs(job_dir)
+                if pngs:
+                    return job_id, pngs, False
+            except Exception:
+                pass
+
+        # 3) Fallback to a one-off LibreOffice process. Concurrent soffice runs sharing
+        # a user profile silently drop conversions (exit 0, no PNGs), so each run
+        # gets a throwaway profile instead of serializing them behind a lock.
         soffice_path = os.getenv('SOFFICE_PATH', 'soffice')
-        cmd = [soffice_path, '--headless', '--convert-to', 'png:impress_png_Export', '--outdir', job_dir, input_path]
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=int(os.getenv('PARSER_RENDER_TIMEOUT', '180')))
-        if result.returncode != 0:
-            return None, []
-
-        pngs = [fn for fn in os.listdir(job_dir) if fn.lower().endswith('.png')]
-        pngs.sort()
-        return job_id, pngs
+        with tempfile.TemporaryDirectory(prefix='lo_profile_') as profile_dir:
+            cmd = [
+                soffice_path, '--headless', '--convert-to', 'png:impress_png_Export', '--outdir', job_dir, input_path,
+                f"-env:UserInstallation={pathlib.Path(profile_dir).as_uri()}"
+            ]
+            returncode = _run_soffice(cmd)
+        if returncode != 0:
+            return None, [], False
+
+        return job_id, _rendered_pngs(job_dir), False
     except Exception:
-        return None, []
+        return None, [], False
+
+
+@app.route('/thumbnails-status/<job_id>', methods=['GET'])
+def thumbnails_status(job_id):
+    job = _render_job_state(job_id)
+    if job is None:
+        return ojson({"error": "Unknown render job"}, 404)
+    thumbnails = _thumbnail_urls(job['thumbs_id'], job['pngs']) if job['status'] == 'done' else []
+    return ojson({"status": job['status'], "thumbnails": thumbnails}, 200)
 
 
 @app.route('/thumbnails/<path:subpath>')
 def thumbnails(subpath):
-    full_path = os.path.join(THUMBS_ROOT, subpath)
-    directory = os.path.dirname(full_path)
-    filename = os.path.basename(full_path)
-    return send_from_directory(directory, filename)
+    if XACCEL_THUMBS:
+        # Reject paths escaping THUMBS_ROOT, then let nginx send the file itself
+        if safe_join(THUMBS_ROOT, subpath) is None:
+            abort(404)
+        resp = make_response('')
+        resp.headers['X-Accel-Redirect'] = XACCEL_THUMBS_PREFIX + subpath
+        resp.headers['Content-Type'] = 'image/png'
+        return resp
+
+    # Safe-joins the whole subpath, so nothing outside THUMBS_ROOT is served
+    return send_from_directory(THUMBS_ROOT, subpath)
 
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({"status": "ok", "max_mb": max_mb}), 200
+    return ojson({"status": "ok", "max_mb": max_mb}, 200)
 
 
 @app.route('/parse-pptx', methods=['POST'])
 def parse_pptx():
     if 'file' not in request.files:
-        return jsonify({"error": "No file part"}), 400
+        return ojson({"error": "No file part"}, 400)
 
     file = request.files['file']
     if file.filename == '':
-        return jsonify({"error": "No selected file"}), 400
+        return ojson({"error": "No selected file"}, 400)
 
     filename = secure_filename(file.filename)
     ext = (os.path.splitext(filename)[1] or '').lower()
     if ext not in ['.pptx', '.ppt']:
-        return jsonify({"error": "Unsupported file type. Please upload a .pptx or .ppt file."}), 400
+        return ojson({"error": "Unsupported file type. Please upload a .pptx or .ppt file."}, 400)
 
     try:
-        file_bytes = file.read()
-        stream = io.BytesIO(file_bytes)
-
-        data = extract_pptx_data(stream)
-
         # Optional rendering of thumbnails
         should_render = os.getenv('PARSER_RENDER_THUMBS', '1') != '0'
+        # thumbnails=async answers as soon as parsing is done; clients then poll
+        # /thumbnails-status/<render_job_id> for the slide images
+        background = request.args.get('thumbnails') == 'async'
         job_id, pngs = (None, [])
-        if should_render:
-            job_id, pngs = _render_thumbnails_to_disk(file_bytes, filename)
+        render_job_id = render_status = None
+        if should_render or ext == '.ppt':
+            # The renderer and the .ppt conversion need the deck on disk: stream it
+            # there once, then parse that file while the render runs in the background
+            input_path, digest = _save_upload_to_job_dir(file.stream, filename)
+            if ext == '.ppt':
+                try:
+                    input_path = _convert_ppt_to_pptx(input_path, digest)
+                except Exception:
+                    shutil.rmtree(os.path.dirname(input_path), ignore_errors=True)
+                    raise
+            cached = _cached_thumbnails(digest) if should_render else None
+            render = None
+            if should_render and not cached:
+                render = render_executor.submit(_render_thumbnails_to_disk, input_path)
+            try:
+                with open(input_path, 'rb') as saved:
+                    data = extract_pptx_data(saved)
+            except Exception:
+                # Drop the upload once nothing reads it any more
+                discard = partial(shutil.rmtree, os.path.dirname(input_path), ignore_errors=True)
+                if render is None:
+                    discard()
+                else:
+                    render.cancel()
+                    render.add_done_callback(lambda _: discard())
+                raise
+
+            if not should_render:
+                shutil.rmtree(os.path.dirname(input_path), ignore_errors=True)
+            elif cached:
+                # Same deck rendered before: serve those thumbnails, drop this upload
+                job_id, pngs = cached
+                shutil.rmtree(os.path.dirname(input_path), ignore_errors=True)
+                render_status = 'done'
+            elif background:
+                # Registered only now that parsing is done with the upload, since
+                # finishing the job moves the job directory into the cache
+                render_job_id = os.path.basename(os.path.dirname(input_path))
+                render_status = 'pending'
+                _start_render_job(render_job_id)
+                render.add_done_callback(partial(_finish_render_job, render_job_id, digest))
+            else:
+                job_id, pngs = _store_render(os.path.basename(os.path.dirname(input_path)), digest, render)
+        else:
+            # Parse straight from the upload stream, no in-memory copy of the file
+            data = extract_pptx_data(file.stream)
 
         if job_id and pngs:
-            base = request.host_url.rstrip('/')
             # Attach per-slide thumbnail_url (best-effort order match)
-            for idx, slide in enumerate(data['slides']):
-                if idx < len(pngs):
-                    slide['thumbnail_url'] = f"{base}/thumbnails/{job_id}/{pngs[idx]}"
+            for slide, url in zip(data['slides'], _thumbnail_urls(job_id, pngs)):
+                slide['thumbnail_url'] = url
+
+        if background and should_render:
+            data['render_job_id'] = render_job_id
+            data['render_status'] = render_status
 
         if not data.get('text_content') and not data.get('slides'):
-            return jsonify({"error": "No extractable content found in the presentation."}), 422
+            return ojson({"error": "No extractable content found in the presentation."}, 422)
 
-        return jsonify(data), 200
+        return ojson(data, 200)
     except Exception as e:
-        return jsonify({"error": f"Parsing failed: {str(e)}"}), 500
+        return ojson({"error": f"Parsing failed: {str(e)}"}, 500)
+
+
+# Input-independent parts of the /analyze-slide response, built once. They are
+# shared between responses and only ever serialized, never mutated.
+_STATIC_LAYOUT_RECS = {
+    "effectiveness": "unknown",
+    "visualHierarchy": "headline > key point > support"
+}
+_STATIC_LAYOUT_CHANGES = ("Increase whitespace around content", "Limit to one idea per slide")
+_STATIC_COLOR_RECS = {
+    "effectiveness": "unknown",
+    "recommendedPalette": ["#1F2937", "#3B82F6", "#F3F4F6"],
+    "colorPsychology": "neutral with highlight",
+    "accessibility": "ensure 4.5:1 contrast"
+}
+_STATIC_TYPOGRAPHY_RECS = {
+    "readability": "unknown",
+    "recommendedFonts": ["Inter", "Source Sans Pro"],
+    "sizing": "Headline 28-36, body 16-18",
+    "hierarchy": "headline > bullets > notes"
+}
+_STATIC_QUICK_WINS = [
+    "Convert paragraphs to 3-5 bullets",
+    "Highlight 3-5 keywords",
+    "Add a relevant visual"
+]
+
+
+def _count_words(text):
+    # Counts are only compared against thresholds up to 90, so stop after WORD_COUNT_CAP
+    # words instead of splitting the whole (possibly huge) text into a list
+    return sum(1 for _ in islice(_WORD_RE.finditer(text), WORD_COUNT_CAP))
 
 
 @app.route('/analyze-slide', methods=['POST'])
@@ -277,20 +907,21 @@ def analyze_slide():
         presentation_context = data.get('presentation_context', {})
 
         text = (slide.get('text_content') or '').strip()
-        word_count = len(text.split()) if text else 0
+        word_count = _count_words(text)
         images = int(slide.get('images') or 0)
         charts = int(slide.get('charts') or 0)
         tables = int(slide.get('tables') or 0)
+        visuals = images + charts + tables
 
         length_label = 'appropriate'
         if word_count > 90:
             length_label = 'too long'
-        elif word_count < 10 and (images + charts + tables) == 0:
+        elif word_count < 10 and visuals == 0:
             length_label = 'too short'
 
         clarity = 'clear' if word_count <= 50 else 'mixed'
         organization = 'structured' if '\n' in text or '-' in text or '•' in text else 'block text'
-        effectiveness = 'high' if images + charts + tables > 0 or word_count <= 60 else 'medium'
+        effectiveness = 'high' if visuals > 0 or word_count <= 60 else 'medium'
         priority = 'important' if length_label != 'appropriate' else 'normal'
 
         response = {
@@ -308,9 +939,11 @@ def analyze_slide():
                     "length": length_label,
                     "keyMessages": [text[:90]] if text else [],
                     "improvements": [
-                        "Reduce text density" if length_label == 'too long' else "",
-                        "Add structure with bullets" if organization == 'block text' else "",
-                        "Add a supporting visual" if (images + charts + tables) == 0 else ""
+                        improvement for improvement, applies in (
+                            ("Reduce text density", length_label == 'too long'),
+                            ("Add structure with bullets", organization == 'block text'),
+                            ("Add a supporting visual", visuals == 0)
+                        ) if applies
                     ]
                 },
                 "visualElements": {
@@ -321,49 +954,27 @@ def analyze_slide():
             },
             "designRecommendations": {
                 "layout": {
+                    **_STATIC_LAYOUT_RECS,
                     "currentLayout": slide.get('layout_type') or 'unknown',
-                    "effectiveness": "unknown",
                     "recommendedLayout": "title + content" if word_count > 0 else "full-bleed visual",
                     "specificChanges": [
                         "Use bullets for lists" if organization == 'block text' else "",
-                        "Increase whitespace around content",
-                        "Limit to one idea per slide"
-                    ],
-                    "visualHierarchy": "headline > key point > support"
-                },
-                "colorScheme": {
-                    "currentColors": slide.get('colors') or [],
-                    "effectiveness": "unknown",
-                    "recommendedPalette": ["#1F2937", "#3B82F6", "#F3F4F6"],
-                    "colorPsychology": "neutral with highlight",
-                    "accessibility": "ensure 4.5:1 contrast"
+                        *_STATIC_LAYOUT_CHANGES
+                    ]
                 },
-                "typography": {
-                    "currentFonts": slide.get('fonts') or [],
-                    "readability": "unknown",
-                    "recommendedFonts": ["Inter", "Source Sans Pro"],
-                    "sizing": "Headline 28-36, body 16-18",
-                    "hierarchy": "headline > bullets > notes"
-                }
+                "colorScheme": {**_STATIC_COLOR_RECS, "currentColors": slide.get('colors') or []},
+                "typography": {**_STATIC_TYPOGRAPHY_RECS, "currentFonts": slide.get('fonts') or []}
             },
-            "quickWins": [
-                "Convert paragraphs to 3-5 bullets",
-                "Highlight 3-5 keywords",
-                "Add a relevant visual"
-            ],
+            "quickWins": _STATIC_QUICK_WINS,
             "priorityFixes": [
                 "Reduce word count" if length_label == 'too long' else "Ensure one message per slide"
             ]
         }
 
-        response["contentAnalysis"]["textContent"]["improvements"] = [
-            i for i in response["contentAnalysis"]["textContent"]["improvements"] if i
-        ]
-
-        return jsonify(response), 200
+        return ojson(response, 200)
 
     except Exception as e:
-        return jsonify({"error": f"Slide analysis failed: {str(e)}"}), 500
+        return ojson({"error": f"Slide analysis failed: {str(e)}"}, 500)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Checks that streamed JSON responses stay streamed once every after_request
+hook (including response compression) has run.
+"""
+
+import unittest
+
+from flask import Response
+
+from app import app, json_stream
+
+
+class StreamedResponseTest(unittest.TestCase):
+    def test_json_stream_is_not_buffered(self):
+        result = {'slide_count': 2, 'slides': [{'slide_number': 1}, {'slide_number': 2}]}
+        with app.test_request_context('/parse-pptx', method='PUT', headers={'Accept-Encoding': 'br, gzip'}):
+            response = app.process_response(Response(json_stream(result), mimetype='application/json'))
+            self.assertTrue(response.is_streamed)
+            self.assertNotIn('Content-Encoding', response.headers)
+            self.assertEqual(
+                b''.join(response.iter_encoded()),
+                b'{"slide_count":2,"slides":[{"slide_number":1},{"slide_number":2}]}'
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Checks that the streaming XML reader extracts the same slide dicts as the
+python-pptx path.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from app import EnhancedFileParser, PptxXmlReader
+
+
+def build_sample_deck(path):
+    """Write a small deck with text, a table, notes and two layouts"""
+    prs = Presentation()
+
+    title_slide = prs.slides.add_slide(prs.slide_layouts[0])
+    title_slide.shapes.title.text = 'Quarterly review'
+    title_slide.placeholders[1].text = 'Finance team'
+    title_slide.notes_slide.notes_text_frame.text = 'Open with the headline number'
+
+    content_slide = prs.slides.add_slide(prs.slide_layouts[5])
+    content_slide.shapes.title.text = 'Revenue by region'
+    text_box = content_slide.shapes.add_textbox(Inches(1), Inches(2), Inches(4), Inches(1))
+    text_box.text_frame.text = 'EMEA grew fastest'
+    text_box.text_frame.add_paragraph().text = 'APAC flat'
+    content_slide.shapes.add_table(2, 2, Inches(1), Inches(3), Inches(4), Inches(1))
+
+    prs.save(path)
+
+
+def make_targets_absolute(src, dst):
+    """Copy a deck, rewriting relative slide relationship targets as package-rooted paths"""
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if re.fullmatch(r'ppt/slides/_rels/slide\d+\.xml\.rels', item.filename):
+                data = data.replace(b'Target="../', b'Target="/ppt/')
+            zout.writestr(item, data)
+
+
+class PptxXmlReaderParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.deck_path = os.path.join(cls.tmp_dir, 'sample.pptx')
+        build_sample_deck(cls.deck_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def python_pptx_slides(self, path):
+        parser = EnhancedFileParser()
+        prs = Presentation(path)
+        return parser._process_slide_chunk(list(prs.slides), 0, len(prs.slides))
+
+    def xml_reader_slides(self, path):
+        with PptxXmlReader(path) as reader:
+            return [reader.extract_slide(index) for index in range(len(reader.slide_parts))]
+
+    def assertSameSlides(self, xml_slides, pptx_slides):
+        self.assertEqual(len(xml_slides), len(pptx_slides))
+        for xml_slide, pptx_slide in zip(xml_slides, pptx_slides):
+            # Both sides collect colors and fonts into sets, so compare them unordered
+            for key in ('colors', 'fonts'):
+                self.assertCountEqual(xml_slide.pop(key), pptx_slide.pop(key))
+            self.assertEqual(xml_slide, pptx_slide)
+
+    def test_slides_match_python_pptx(self):
+        pptx_slides = self.python_pptx_slides(self.deck_path)
+        self.assertEqual(pptx_slides[0]['notes'], 'Open with the headline number')
+        self.assertEqual(pptx_slides[1]['tables'], 1)
+        self.assertSameSlides(self.xml_reader_slides(self.deck_path), pptx_slides)
+
+    def test_shape_count_matches_python_pptx(self):
+        prs = Presentation(self.deck_path)
+        with PptxXmlReader(self.deck_path) as reader:
+            self.assertEqual(
+                [reader.count_shapes(xml) for xml in reader.read_slide_xml()],
+                [len(slide._element.xpath('.//p:sp')) for slide in prs.slides]
+            )
+
+    def test_absolute_relationship_targets(self):
+        absolute_path = os.path.join(self.tmp_dir, 'absolute.pptx')
+        make_targets_absolute(self.deck_path, absolute_path)
+
+        xml_slides = self.xml_reader_slides(absolute_path)
+        self.assertEqual(xml_slides[0]['notes'], 'Open with the headline number')
+        self.assertNotEqual(xml_slides[0]['layout_type'], 'unknown')
+        self.assertSameSlides(xml_slides, self.python_pptx_slides(self.deck_path))
+
+
+if __name__ == '__main__':
+    unittest.main()